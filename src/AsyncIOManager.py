@@ -3,12 +3,22 @@ Based on TDAsyncIO by Motoki Sonoda
 """
 
 import asyncio
+import os
 import time
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union, Callable
 from TDStoreTools import StorageManager
 import traceback
 
+# Optional uvloop (libuv-based event loop, not on Windows), used only when opted in via APIOP_UVLOOP
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Set APIOP_UVLOOP=1 to create the managed loop with uvloop when no usable loop exists yet
+UVLOOP_ENV_FLAG = 'APIOP_UVLOOP'
+
 class TaskStatus(Enum):
     PENDING = "pending"
     RUNNING = "running" 
@@ -43,13 +53,17 @@ class AsyncIOManager:
         self.ownerComp = ownerComp
         self.logger = self.ownerComp.op('Logger').ext.Logger
         self.logger.log('AsyncIOManager initialized', 'AsyncIOManager initialized', 'INFO')
-        # Get the current event loop
-        self.loop = asyncio.get_event_loop()
+        # Get the current event loop (reused so tasks of other components keep running on it)
+        try:
+            self.loop = asyncio.get_event_loop()
+        except RuntimeError:
+            self.loop = None
         
-        # If the current event loop was closed, create a new one
-        if self.loop.is_closed():
-            self.loop = asyncio.new_event_loop()
+        # If there's no current event loop or it was closed, create a new one
+        if self.loop is None or self.loop.is_closed():
+            self.loop = self._new_event_loop()
             asyncio.set_event_loop(self.loop)
+        self.logger.log(f'AsyncIOManager using event loop {type(self.loop).__module__}.{type(self.loop).__name__}', 'TDAsyncIO', level='INFO')
         
         # Task tracking
         self.tasks = {}
@@ -59,6 +73,18 @@ class AsyncIOManager:
         # Set up the task monitoring table
         self._setup_task_table()
     
+    def _new_event_loop(self):
+        """
+        Create an event loop without touching the process-wide event loop policy.
+        Uses uvloop when it is installed and APIOP_UVLOOP is set, otherwise asyncio's default loop.
+        """
+        use_uvloop = os.environ.get(UVLOOP_ENV_FLAG, '').strip().lower() in ('1', 'true', 'yes', 'on')
+        if use_uvloop:
+            if uvloop is not None:
+                return uvloop.new_event_loop()
+            self.logger.log(f'{UVLOOP_ENV_FLAG} is set but uvloop is not installed, using the default event loop', 'TDAsyncIO', level='WARNING')
+        return asyncio.new_event_loop()
+    
     def _setup_task_table(self):
         """Set up the table for tracking asyncio tasks"""
         table = self.ownerComp.op('task_table')
@@ -1,15 +1,17 @@
 from MediaGenBase import MediaGenBase
-from model_detector import ModelDetector
-from api_request_handler import APIRequestHandler
-from models_registry import get_registry
 import aiohttp
-import json
 import base64
-import tempfile
-import os
 
 
 class ImageGen(MediaGenBase):
+    
+    # Menu options for setup_parameters
+    _PROVIDER_OPTIONS = ('Kling', 'Google')
+    _ASPECT_RATIO_OPTIONS = ('21:9', '1:1', '4:3', '3:2', '2:3', '5:4', '4:5', '3:4', '16:9', '9:16')
+    _RESOLUTION_OPTIONS = ('1K', '2K', '4K')
+    
+    # Reference images are read from REF_IN1 through REF_IN14 (API limit)
+    MAX_REFERENCE_IMAGES = 14
 
     def __init__(self, ownerComp):
         # Initialize parent class first (with media_type='image')
@@ -17,10 +19,6 @@ class ImageGen(MediaGenBase):
         
         self.logger.log('ImageGen initialized', level='INFO')
         
-        # Initialize model detector and registry
-        self.registry = get_registry()
-        self.model_detector = ModelDetector(self.registry)
-        
         # Setup custom parameters
         self.setup_parameters()
 
@@ -34,10 +32,9 @@ class ImageGen(MediaGenBase):
                             order=0)
         
         # Create Provider parameter (menu with available providers)
-        provider_options = ['Kling', 'Google']
         self.create_parameter('Provider', 'menu', page='Config',
                             label='Provider',
-                            menu_items=provider_options,
+                            menu_items=self._PROVIDER_OPTIONS,
                             default='Google',
                             help_text='Select the AI provider',
                             order=1)
@@ -45,24 +42,22 @@ class ImageGen(MediaGenBase):
         # Create Model parameter (menu, initially empty, populated by Provider callback)
         self.create_parameter('Model', 'menu', page='Config',
                             label='Model',
-                            menu_items=[],
+                            menu_items=(),
                             default='',
                             help_text='Select the model (updates based on provider selection)',
                             order=2)
         
         # Create Aspect Ratio parameter (menu based on API docs)
-        aspect_ratio_options = ['21:9', '1:1', '4:3', '3:2', '2:3', '5:4', '4:5', '3:4', '16:9', '9:16']
         self.create_parameter('Aspectratio', 'menu', page='Config',
                             label='Aspect Ratio',
-                            menu_items=aspect_ratio_options,
+                            menu_items=self._ASPECT_RATIO_OPTIONS,
                             default='1:1',
                             help_text='Image aspect ratio (default: 1:1)')
         
         # Create Resolution parameter (menu based on API docs)
-        resolution_options = ['1K', '2K', '4K']
         self.create_parameter('Resolution', 'menu', page='Config',
                             label='Resolution',
-                            menu_items=resolution_options,
+                            menu_items=self._RESOLUTION_OPTIONS,
                             default='1K',
                             help_text='Image resolution (default: 1K)')
         
@@ -81,8 +76,13 @@ class ImageGen(MediaGenBase):
                             label='Clear Files',
                             help_text='Clear all entries from SAVED_FILES table')
         
-        # Initialize model menu based on default provider
-        self.Provider()
+        # Create Reload Registry pulse button
+        self.create_parameter('Clearregistrycache', 'pulse', page='Config',
+                            label='Reload Registry',
+                            help_text='Reload the model registry (picks up models_registry.json changes)')
+        
+        # Initialize model menu based on default provider (deferred so component load isn't blocked)
+        self._schedule_provider_refresh()
 
     def Provider(self):
         """
@@ -104,70 +104,7 @@ class ImageGen(MediaGenBase):
             return None
         return model_id
     
-    def _collect_reference_images(self):
-        """
-        Collect and encode reference images from REF_IN operators.
-        Checks REF_IN1_, REF_IN2_, etc. (up to 14 images as per API limit).
-        
-        Returns:
-            list: List of base64-encoded image data URIs, empty if none found
-        """
-        image_urls = []
-        max_images = 14  # API limit
-        
-        for i in range(1, max_images + 1):
-            # Check the resized version first
-            ref_resized = self.ownerComp.op(f'REF_IN{i}_')
-            if not ref_resized:
-                continue
-            
-            # Check if it's not empty (128x128 means empty)
-            if ref_resized.width == 128 and ref_resized.height == 128:
-                continue
-            
-            # Get the non-resized version
-            ref_image = self.ownerComp.op(f'REF_IN{i}')
-            if not ref_image:
-                continue
-            
-            try:
-                # Save to temporary file
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                
-                # Save the image from TOP operator
-                ref_image.save(temp_path)
-                
-                # Read and encode to base64
-                with open(temp_path, 'rb') as f:
-                    image_bytes = f.read()
-                    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-                
-                # Format as data URI
-                data_uri = f'data:image/png;base64,{encoded_image}'
-                image_urls.append(data_uri)
-                
-                # Clean up temp file
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
-                
-                self.logger.log(f"Collected reference image from REF_IN{i}", level='INFO')
-                
-            except Exception as e:
-                self.logger.log(f"Error processing REF_IN{i}: {e}", level='ERROR')
-                # Clean up temp file on error
-                try:
-                    if 'temp_path' in locals():
-                        os.unlink(temp_path)
-                except:
-                    pass
-        
-        return image_urls
-
-
-    async def _generate_image_async(self, prompt, model, output_dir, aspect_ratio, resolution, image_urls=None):
+    async def _generate_image_async(self, prompt, model, output_dir, aspect_ratio, resolution, ref_tops=None, prompt_preview=None):
         """
         Async method to generate an image from the AIMLAPI.
         Uses API request handler for unified request handling.
@@ -178,24 +115,30 @@ class ImageGen(MediaGenBase):
             output_dir (str): Directory to save the generated image
             aspect_ratio (str): Image aspect ratio
             resolution (str): Image resolution
-            image_urls (list, optional): List of base64-encoded image data URIs for editing mode
+            ref_tops (list, optional): List of (index, TOP) tuples to encode for editing mode
+            prompt_preview (str, optional): Truncated prompt for logging (computed if not given)
             
         Returns:
             str: Path to the saved image file, or None if failed
         """
         try:
-            # Get API key from AOP
-            api_key = op.AOP.Getkey('aimlapi')
+            # Shared API request handler (API key is looked up on first use)
+            api_handler = self._get_api_handler()
             
             # Get model configuration from registry
-            model_config = self.registry.get(model)
+            model_config = self._get_model_config(model)
             if not model_config:
                 error_msg = f"Model {model} not found in registry"
                 self.logger.log(error_msg, level='ERROR')
                 return None
             
-            # Initialize API request handler
-            api_handler = APIRequestHandler(api_key, self.logger)
+            # Encode reference images (file read and base64 run off the main thread)
+            image_urls = None
+            if ref_tops:
+                image_urls = await self._encode_reference_images(ref_tops)
+                if not image_urls:
+                    self.logger.log(f"Reference images for model {model} could not be encoded.", level='ERROR')
+                    return None
             
             # Build payload from model config and parameters
             payload = {
@@ -212,7 +155,8 @@ class ImageGen(MediaGenBase):
                 self.logger.log(f"Reference images prepared and included in request payload: {len(image_urls)} image(s) (image_urls)", level='INFO')
             
             # Truncate prompt for logging (don't log whole prompt)
-            prompt_preview = prompt[:50] + '...' if len(prompt) > 50 else prompt
+            if prompt_preview is None:
+                prompt_preview, _ = self._describe_prompt(prompt)
             self.logger.log(f"Generating image with prompt: '{prompt_preview}'", level='INFO')
             self.logger.log(f"Using model: {model}", level='INFO')
             
@@ -251,11 +195,11 @@ class ImageGen(MediaGenBase):
                         self._add_to_saved_files_table(filepath, prompt)
                         return filepath
                 else:
-                    error_msg = "Unexpected response format. Response data: " + json.dumps(response_data, indent=2)
+                    error_msg = "Unexpected response format. Response data: " + api_handler.format_json(response_data)
                     self.logger.log(error_msg, level='ERROR')
                     return None
             else:
-                error_msg = "No image data in response. Full response: " + json.dumps(response_data, indent=2)
+                error_msg = "No image data in response. Full response: " + api_handler.format_json(response_data)
                 self.logger.log(error_msg, level='ERROR')
                 return None
                         
@@ -296,15 +240,16 @@ class ImageGen(MediaGenBase):
         supports_image, is_required = self._model_supports_image_parameter(model)
         
         # Collect reference images if model supports them (required or optional)
-        image_urls = []
+        # Reference TOPs are resolved here; encoding happens in the async task
+        ref_tops = []
         if supports_image:
-            image_urls = self._collect_reference_images()
-            if is_required and not image_urls:
+            ref_tops = self._collect_reference_tops(self.MAX_REFERENCE_IMAGES)
+            if is_required and not ref_tops:
                 error_msg = f"Model {model} requires reference images, but none were found. Please provide reference images in REF_IN operators."
                 self.logger.log(error_msg, level='ERROR')
                 return None
-            elif image_urls:
-                self.logger.log(f"Using {len(image_urls)} reference image(s) from REF_IN operators for model {model}", level='INFO')
+            elif ref_tops:
+                self.logger.log(f"Using {len(ref_tops)} reference image(s) from REF_IN operators for model {model}", level='INFO')
         
         # Get output directory from global AOP parameter
         if output_dir is None:
@@ -312,27 +257,40 @@ class ImageGen(MediaGenBase):
         aspect_ratio = aspect_ratio if aspect_ratio is not None else self.ownerComp.par.Aspectratio.eval()
         resolution = resolution if resolution is not None else self.ownerComp.par.Resolution.eval()
         
+        # Reuse the running task if an identical request is already in flight
+        inflight_key = (prompt, model, output_dir, aspect_ratio, resolution,
+                        tuple((i, self._top_signature(top)) for i, top in ref_tops))
+        existing_task_id = self._find_inflight_task(inflight_key)
+        if existing_task_id is not None:
+            return existing_task_id
+        
         # Set Active to True when starting generation
         self.ownerComp.par.Active = True
         
         # Create completion callback that updates Active status
         def on_completion(task):
+            self._inflight.pop(inflight_key, None)
             # Check if there are any active tasks remaining
             self._update_active_status()
             # Call user's completion callback if provided
             if completion_callback:
                 completion_callback(task)
         
+        # Truncated prompt shared by the task info and the coroutine's logging
+        prompt_preview, _ = self._describe_prompt(prompt)
+        
         # Create the async coroutine
-        coro = self._generate_image_async(prompt, model, output_dir, aspect_ratio, resolution, image_urls if image_urls else None)
+        coro = self._generate_image_async(prompt, model, output_dir, aspect_ratio, resolution, ref_tops if ref_tops else None, prompt_preview)
         
-        # Run it through the async manager
-        task_id = self.tdAsyncIO.ext.AsyncIOManager.Run(
-            coro,
-            description=f"Generate Image: {prompt[:50]}...",
-            info={'prompt': prompt[:50] + '...' if len(prompt) > 50 else prompt, 'model': model, 'output_dir': output_dir},
+        # Run it through the async manager (bounded by the per-component concurrency limit)
+        task_id = self._get_async_mgr().Run(
+            self._run_limited(coro),
+            description=f"Generate Image: {prompt_preview}",
+            info={'prompt': prompt_preview, 'model': model, 'output_dir': output_dir},
             completion_callback=on_completion
         )
+        if task_id is not None:
+            self._inflight[inflight_key] = task_id
         
         return task_id
     
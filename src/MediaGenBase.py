@@ -5,17 +5,46 @@ Provides common functionality for ImageGen and VideoGen classes.
 """
 
 from AopUtil import AopUtil
-from models_registry import extract_provider_from_model_id, get_models_by_provider, get_registry
+from api_request_handler import APIRequestHandler
+from model_detector import ModelDetector
+from models_registry import build_model_caps, extract_provider_from_model_id, get_provider_index, get_registry, reload_registry
+import asyncio
 import os
 import base64
 import re
 import tempfile
 from datetime import datetime
+from functools import cached_property
+
+# Prefer the SIMD-accelerated pybase64 encoder; fall back to stdlib base64
+try:
+    import pybase64 as b64codec
+except ImportError:
+    b64codec = base64
 
 
 class MediaGenBase(AopUtil):
     """Base class for media generation with common functionality."""
     
+    # Data URI prefix for encoded reference images (kept as bytes to avoid str round-trips)
+    PNG_DATA_URI_PREFIX = b'data:image/png;base64,'
+    
+    # Size of an unconnected REF_IN TOP (128x128 typically means empty in TouchDesigner)
+    EMPTY_TOP_SIZE = (128, 128)
+    
+    # Maximum generations per component running at once (further submissions wait their turn)
+    MAX_CONCURRENT_GENERATIONS = 4
+    
+    # Characters of the prompt shown in logs and task descriptions
+    PROMPT_PREVIEW_LENGTH = 50
+    
+    # AsyncIOManager task status values of a task that has not finished yet
+    _ACTIVE_TASK_STATUSES = frozenset(('pending', 'running'))
+    
+    # Precompiled patterns for sanitizing prompt words into filenames
+    _RE_STRIP = re.compile(r'[^\w\s-]')
+    _RE_COLLAPSE = re.compile(r'[-\s]+')
+    
     def __init__(self, ownerComp, media_type='media'):
         """
         Initialize the base media generation class.
@@ -28,7 +57,181 @@ class MediaGenBase(AopUtil):
         self.ownerComp = ownerComp
         self.media_type = media_type
         self.logger = op('Logger').ext.Logger if op('Logger') else print
+        # Bound Logger.Clearlog (None if the logger doesn't provide it), used by Clearfiles
+        self._logger_clearlog = getattr(self.logger, 'Clearlog', None)
         self.tdAsyncIO = self.ownerComp.op('TDAsyncIO')
+        # Cache the AsyncIOManager extension (may not be initialized yet on load)
+        try:
+            self._async_mgr = self.tdAsyncIO.ext.AsyncIOManager
+        except AttributeError:
+            self._async_mgr = None
+        # API key is looked up lazily on first generation and reused afterwards
+        self._api_key = None
+        # Shared API request handler (and its HTTP session), created on first generation
+        self._api_handler = None
+        # Resolved child operators by name (see _get_op)
+        self._op_cache = {}
+        # Last prompt with its derived (preview, filename snippet), see _describe_prompt
+        self._prompt_cache = None
+        # Running generations keyed by their request parameters -> task ID (see _find_inflight_task)
+        self._inflight = {}
+        # Bounds concurrent generations (encoding, API calls, downloads), created per event loop in _run_limited
+        self._generation_sem = None
+        self._generation_sem_loop = None
+        # Precomputed ModelCaps by model ID, None for IDs not in the registry (see _get_model_caps)
+        self._model_caps = {}
+        # Provider / model the parameter callbacks last applied (re-entrant callbacks with the same value return early)
+        self._last_provider = None
+        self._last_model_id = None
+        # Encoded reference images: TOP path -> ((totalCooks, width, height), data_uri), see _top_content_key
+        self._image_cache = {}
+        # Encodes in progress: TOP path -> (cache key, future), shared by concurrent generations
+        self._pending_encodes = {}
+    
+    @cached_property
+    def registry(self):
+        """Model registry, loaded on first access (reassigned by Clearregistrycache)."""
+        return get_registry()
+    
+    @cached_property
+    def model_detector(self):
+        """ModelDetector over the current registry, built on first access."""
+        return ModelDetector(self.registry)
+    
+    @cached_property
+    def _provider_index(self):
+        """(provider, media_type) -> sorted model IDs for the current registry (see get_provider_index)."""
+        return get_provider_index(self.registry)
+    
+    def _schedule_provider_refresh(self):
+        """Populate the Model menu on the next frame instead of during extension init."""
+        run("args[0]()", self.Provider, delayFrames=1, delayRef=self.ownerComp)
+    
+    def _get_api_key(self):
+        """
+        Get the AIMLAPI key from AOP, caching it after the first lookup.
+        
+        Returns:
+            str: The AIMLAPI API key
+            
+        Raises:
+            ValueError: If no valid key is found
+        """
+        if self._api_key is None:
+            self._api_key = op.AOP.Getkey('aimlapi')
+        return self._api_key
+    
+    def _get_api_handler(self):
+        """
+        Get the shared API request handler, creating it on first use.
+        Reusing one handler keeps its HTTP connection pool alive across generations.
+        
+        Returns:
+            APIRequestHandler: The shared request handler
+            
+        Raises:
+            ValueError: If no valid API key is found
+        """
+        if self._api_handler is None:
+            self._api_handler = APIRequestHandler(self._get_api_key(), self.logger)
+        return self._api_handler
+    
+    def onDestroyTD(self):
+        """Close the shared HTTP session when the extension is destroyed or reinitialized."""
+        api_handler, self._api_handler = self._api_handler, None
+        if api_handler is None:
+            return
+        try:
+            self._get_async_mgr().Run(api_handler.close(), description="Close API session")
+        except Exception as e:
+            self.logger.log(f"Error closing API session: {e}", level='ERROR')
+    
+    async def _run_limited(self, coro):
+        """
+        Run a generation coroutine once a concurrency slot is free.
+        
+        Args:
+            coro: Generation coroutine
+            
+        Returns:
+            The coroutine's result
+        """
+        try:
+            # Recreate the semaphore if AsyncIOManager replaced the loop (a semaphore is bound to one loop)
+            loop = asyncio.get_running_loop()
+            if self._generation_sem is None or self._generation_sem_loop is not loop:
+                self._generation_sem = asyncio.Semaphore(self.MAX_CONCURRENT_GENERATIONS)
+                self._generation_sem_loop = loop
+            generation_sem = self._generation_sem
+            if generation_sem.locked():
+                self.logger.log(f"{self.MAX_CONCURRENT_GENERATIONS} generations already running, queued", level='INFO')
+            async with generation_sem:
+                return await coro
+        finally:
+            # Closes the coroutine if it was cancelled while still queued (no-op once it has run)
+            coro.close()
+    
+    def _get_op(self, name):
+        """
+        Get a child operator of ownerComp, caching the resolved reference.
+        Cached references are revalidated via .valid so deleted or replaced operators are looked up again.
+        
+        Args:
+            name (str): Operator name relative to ownerComp (e.g. 'REF_IN1_', 'SAVED_FILES')
+            
+        Returns:
+            OP: The operator, or None if not found
+        """
+        cached = self._op_cache.get(name)
+        if cached is not None and cached.valid:
+            return cached
+        found = self.ownerComp.op(name)
+        if found is not None:
+            self._op_cache[name] = found
+        else:
+            self._op_cache.pop(name, None)
+        return found
+    
+    def _get_async_mgr(self):
+        """
+        Get the cached AsyncIOManager extension, resolving it if it was not ready at init.
+        
+        Returns:
+            AsyncIOManager: The TDAsyncIO AsyncIOManager extension
+        """
+        if self._async_mgr is None:
+            self._async_mgr = self.tdAsyncIO.ext.AsyncIOManager
+        return self._async_mgr
+    
+    def _describe_prompt(self, prompt):
+        """
+        Get the log preview and filename snippet for a prompt.
+        The result for the last prompt is cached, so repeated generations with an unchanged prompt skip the rescan.
+        
+        Args:
+            prompt (str): The text prompt
+            
+        Returns:
+            tuple: (prompt_preview, prompt_snippet)
+                - prompt_preview (str): First PROMPT_PREVIEW_LENGTH characters, with '...' if truncated
+                - prompt_snippet (str): Sanitized first 3 words for filenames
+        """
+        cache = self._prompt_cache
+        if cache is not None and cache[0] == prompt:
+            return cache[1], cache[2]
+        
+        limit = self.PROMPT_PREVIEW_LENGTH
+        prompt_preview = prompt if len(prompt) <= limit else prompt[:limit] + '...'
+        
+        # Get first couple of words from prompt (sanitize for filename)
+        words = prompt.split()[:3]  # First 3 words
+        prompt_snippet = '_'.join(words).lower()
+        # Remove invalid filename characters
+        prompt_snippet = self._RE_STRIP.sub('', prompt_snippet)
+        prompt_snippet = self._RE_COLLAPSE.sub('_', prompt_snippet)
+        
+        self._prompt_cache = (prompt, prompt_preview, prompt_snippet)
+        return prompt_preview, prompt_snippet
     
     def _generate_filename(self, prompt, output_dir, file_extension='.png'):
         """
@@ -42,16 +245,13 @@ class MediaGenBase(AopUtil):
         Returns:
             tuple: (filepath, filename) - Full path and filename
         """
-        # Get first couple of words from prompt (sanitize for filename)
-        words = prompt.split()[:3]  # First 3 words
-        prompt_snippet = '_'.join(words).lower()
-        # Remove invalid filename characters
-        prompt_snippet = re.sub(r'[^\w\s-]', '', prompt_snippet)
-        prompt_snippet = re.sub(r'[-\s]+', '_', prompt_snippet)
+        # Sanitized first words of the prompt (cached per prompt)
+        _, prompt_snippet = self._describe_prompt(prompt)
         
         # Create subfolder with node name
         node_name = self.ownerComp.name
         subfolder = os.path.join(output_dir, node_name)
+        # Checked every time so a folder deleted or renamed while the component is alive gets recreated
         os.makedirs(subfolder, exist_ok=True)
         
         # Generate filename with timestamp
@@ -71,7 +271,7 @@ class MediaGenBase(AopUtil):
         Raises:
             ValueError: If PROMPT operator not found
         """
-        prompt_op = self.ownerComp.op('PROMPT')
+        prompt_op = self._get_op('PROMPT')
         if prompt_op:
             return prompt_op.text
         raise ValueError("PROMPT operator not found. Please provide a prompt argument or create a PROMPT operator.")
@@ -83,11 +283,10 @@ class MediaGenBase(AopUtil):
         Returns:
             bool: True if REF_IN1_ exists and is not empty (128x128)
         """
-        ref_in1_resized = self.ownerComp.op('REF_IN1_')
+        ref_in1_resized = self._get_op('REF_IN1_')
         if ref_in1_resized:
-            width, height = ref_in1_resized.width, ref_in1_resized.height
-            # 128x128 typically means empty in TouchDesigner
-            return width != 128 or height != 128
+            # Read both dimensions once and compare as a tuple
+            return (ref_in1_resized.width, ref_in1_resized.height) != self.EMPTY_TOP_SIZE
         return False
     
     def _check_ref_in2_exists(self):
@@ -97,11 +296,10 @@ class MediaGenBase(AopUtil):
         Returns:
             bool: True if REF_IN2_ exists and is not empty (128x128)
         """
-        ref_in2_resized = self.ownerComp.op('REF_IN2_')
+        ref_in2_resized = self._get_op('REF_IN2_')
         if ref_in2_resized:
-            width, height = ref_in2_resized.width, ref_in2_resized.height
-            # 128x128 typically means empty in TouchDesigner
-            return width != 128 or height != 128
+            # Read both dimensions once and compare as a tuple
+            return (ref_in2_resized.width, ref_in2_resized.height) != self.EMPTY_TOP_SIZE
         return False
     
     def _check_ref_in_exists(self, index):
@@ -114,16 +312,194 @@ class MediaGenBase(AopUtil):
         Returns:
             bool: True if REF_IN{i}_ exists and is not empty (128x128)
         """
-        ref_in_resized = self.ownerComp.op(f'REF_IN{index}_')
+        ref_in_resized = self._get_op(f'REF_IN{index}_')
         if ref_in_resized:
-            width, height = ref_in_resized.width, ref_in_resized.height
-            # 128x128 typically means empty in TouchDesigner
-            return width != 128 or height != 128
+            # Read both dimensions once and compare as a tuple
+            return (ref_in_resized.width, ref_in_resized.height) != self.EMPTY_TOP_SIZE
         return False
     
-    def _encode_image_to_base64(self, ref_image):
+    def _collect_reference_tops(self, max_index):
+        """
+        Collect reference image TOPs from REF_IN1 through REF_IN{max_index}, skipping empty inputs.
+        Encoding is deferred to the async generation task (see _encode_reference_images).
+        
+        Args:
+            max_index (int): Highest REF_IN index to check
+            
+        Returns:
+            list: List of (index, TOP) tuples, empty if none found
+        """
+        ref_tops = []
+        
+        for i in range(1, max_index + 1):
+            # Check the resized version first (128x128 means empty)
+            if not self._check_ref_in_exists(i):
+                continue
+            
+            # Get the non-resized version
+            ref_image = self._get_op(f'REF_IN{i}')
+            if ref_image:
+                ref_tops.append((i, ref_image))
+        
+        return ref_tops
+    
+    def _collect_reference_images(self, ref_tops, data_uris):
+        """
+        Pair encoded reference images with their REF_IN slots, dropping (and logging) failed encodes.
+        
+        Args:
+            ref_tops (list): List of (index, TOP) tuples from _collect_reference_tops
+            data_uris (list): Encoded data URI (or None) for each entry of ref_tops
+            
+        Returns:
+            list: List of base64-encoded image data URIs
+        """
+        image_urls = []
+        for (i, _), data_uri in zip(ref_tops, data_uris):
+            if data_uri:
+                image_urls.append(data_uri)
+                self.logger.log(f"Collected reference image from REF_IN{i}", level='INFO')
+            else:
+                self.logger.log(f"Error processing REF_IN{i}", level='ERROR')
+        return image_urls
+    
+    async def _encode_reference_images(self, ref_tops):
+        """
+        Encode reference image TOPs to base64 data URIs.
+        
+        Args:
+            ref_tops (list): List of (index, TOP) tuples from _collect_reference_tops
+            
+        Returns:
+            list: List of base64-encoded image data URIs
+        """
+        # Encode all references concurrently (captures stay on the main thread, base64 runs in the executor)
+        data_uris = await asyncio.gather(*(self._encode_image_to_base64_async(ref_image) for _, ref_image in ref_tops))
+        return self._collect_reference_images(ref_tops, data_uris)
+    
+    def _top_signature(self, top):
+        """
+        Get a cheap identity for a TOP's current content without reading its pixels.
+        
+        Args:
+            top: TouchDesigner TOP operator
+            
+        Returns:
+            tuple: (path, totalCooks, width, height) - changes whenever the TOP recooks (see _top_content_key)
+        """
+        return (top.path, *self._top_content_key(top))
+    
+    def _find_inflight_task(self, key):
+        """
+        Look up a running generation with identical request parameters.
+        Used by Generate to avoid launching duplicate API calls (e.g. on a double-click).
+        
+        Args:
+            key (tuple): Hashable request key built by Generate
+            
+        Returns:
+            int: Task ID of the running generation, or None if there is none
+        """
+        task_id = self._inflight.get(key)
+        if task_id is None:
+            return None
+        # Cancelled or timed-out tasks never run their completion callback, so drop stale entries here
+        task_info = self._get_async_mgr().GetTaskInfo(task_id)
+        if task_info is None or task_info['status'] not in self._ACTIVE_TASK_STATUSES:
+            del self._inflight[key]
+            return None
+        self.logger.log(f"Identical generation already running (task {task_id}), not starting a duplicate", level='INFO')
+        return task_id
+    
+    def _capture_top_png(self, ref_image):
+        """
+        Capture a TouchDesigner TOP operator as PNG.
+        Must run on the main thread (TouchDesigner operator access).
+        Uses the in-memory TOP.saveByteArray when available, otherwise saves to a temporary file.
+        
+        Args:
+            ref_image: TouchDesigner TOP operator
+            
+        Returns:
+            bytes or str: PNG bytes, or path to a temporary PNG file (fallback)
+        """
+        if hasattr(ref_image, 'saveByteArray'):
+            return bytes(ref_image.saveByteArray('.png'))
+        
+        # Fallback: round-trip through a temporary file
+        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
+            temp_path = temp_file.name
+        try:
+            ref_image.save(temp_path)
+        except Exception:
+            self._remove_temp_file(temp_path)
+            raise
+        return temp_path
+    
+    def _remove_temp_file(self, temp_path):
+        """Remove a temporary file, ignoring errors."""
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+    
+    def _encode_png_to_data_uri(self, png_source):
+        """
+        Encode captured PNG data to a base64 data URI.
+        Safe to run in a worker thread (no TouchDesigner operator access).
+        
+        Args:
+            png_source (bytes or str): PNG bytes, or path to a temporary PNG file (removed after reading)
+            
+        Returns:
+            tuple: (data_uri, size_bytes)
+        """
+        if isinstance(png_source, str):
+            try:
+                with open(png_source, 'rb') as f:
+                    image_bytes = f.read()
+            finally:
+                self._remove_temp_file(png_source)
+        else:
+            image_bytes = png_source
+        
+        # Format as data URI: concatenate bytes and decode once
+        data_uri = (self.PNG_DATA_URI_PREFIX + b64codec.b64encode(image_bytes)).decode('ascii')
+        return data_uri, len(image_bytes)
+    
+    def _top_content_key(self, top):
         """
-        Encode a TouchDesigner TOP operator image to base64 data URI.
+        Get a key that changes whenever a TOP's content may have changed, without reading its pixels.
+        Uses the TOP's cook counter rather than cookFrame, which repeats on a paused or looping timeline.
+        
+        Args:
+            top: TouchDesigner TOP operator
+            
+        Returns:
+            tuple: (totalCooks, width, height)
+        """
+        return (top.totalCooks, top.width, top.height)
+    
+    def _get_cached_image(self, ref_image):
+        """
+        Get the cached data URI for a TOP if it has not recooked since it was encoded.
+        
+        Args:
+            ref_image: TouchDesigner TOP operator
+            
+        Returns:
+            tuple: (cache_key, data_uri) - data_uri is None on a cache miss
+        """
+        cache_key = self._top_content_key(ref_image)
+        cached = self._image_cache.get(ref_image.path)
+        if cached is not None and cached[0] == cache_key:
+            return cache_key, cached[1]
+        return cache_key, None
+    
+    async def _encode_image_to_base64_async(self, ref_image):
+        """
+        Encode a TouchDesigner TOP operator image to base64 data URI without stalling the render loop.
+        The TOP is captured on the main thread; encoding runs in a thread executor.
         
         Args:
             ref_image: TouchDesigner TOP operator
@@ -135,49 +511,47 @@ class MediaGenBase(AopUtil):
             return None
         
         try:
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-                temp_path = temp_file.name
-            
-            # Save the image from TOP operator
-            ref_image.save(temp_path)
+            # Reuse the previous encoding if the TOP has not changed
+            cache_key, data_uri = self._get_cached_image(ref_image)
+            if data_uri is not None:
+                self.logger.log(f"Reusing encoded image for unchanged {ref_image.name}", level='INFO')
+                return data_uri
             
-            # Read and encode to base64
-            with open(temp_path, 'rb') as f:
-                image_bytes = f.read()
-                encoded_image = base64.b64encode(image_bytes).decode('utf-8')
+            # Join an identical encode already running (e.g. from GenerateBatch)
+            path = ref_image.path
+            pending = self._pending_encodes.get(path)
+            if pending is not None and pending[0] == cache_key:
+                data_uri, _ = await asyncio.shield(pending[1])
+                return data_uri
             
-            # Format as data URI
-            data_uri = f'data:image/png;base64,{encoded_image}'
+            png_source = self._capture_top_png(ref_image)
+            _, width, height = cache_key
             
-            # Get image dimensions for logging
-            width, height = ref_image.width, ref_image.height
-            size_kb = len(image_bytes) / 1024
-            
-            # Clean up temp file
+            loop = asyncio.get_running_loop()
+            encode_future = loop.run_in_executor(None, self._encode_png_to_data_uri, png_source)
+            self._pending_encodes[path] = (cache_key, encode_future)
             try:
-                os.unlink(temp_path)
-            except:
-                pass
+                data_uri, size_bytes = await asyncio.shield(encode_future)
+            finally:
+                if self._pending_encodes.get(path, (None, None))[1] is encode_future:
+                    del self._pending_encodes[path]
+            self._image_cache[path] = (cache_key, data_uri)
             
+            size_kb = size_bytes / 1024
             self.logger.log(f"Image encoded and prepared: {width}x{height} ({size_kb:.1f} KB, base64 data URI ready)", level='INFO')
             
             return data_uri
             
         except Exception as e:
             self.logger.log(f"Error encoding image: {e}", level='ERROR')
-            # Clean up temp file on error
-            try:
-                if 'temp_path' in locals():
-                    os.unlink(temp_path)
-            except:
-                pass
             return None
     
     def Clearfiles(self):
         """Pulse callback for Clear Files button - clears SAVED_FILES table and adds empty row."""
+        # Also drop cached reference image encodings (they can hold several MB each)
+        self._image_cache.clear()
         try:
-            saved_files_table = self.ownerComp.op('SAVED_FILES')
+            saved_files_table = self._get_op('SAVED_FILES')
             if saved_files_table:
                 # Clear all rows from the table
                 saved_files_table.clear()
@@ -186,7 +560,7 @@ class MediaGenBase(AopUtil):
                 saved_files_table.appendRow(['../empty.png', ''])
                 
                 # Set Scroll cursor to 0
-                scroll_op = self.ownerComp.op('Scroll')
+                scroll_op = self._get_op('Scroll')
                 if scroll_op:
                     scroll_op.par.Cursor = 0
                     self.logger.log("Set Scroll cursor to 0", level='INFO')
@@ -194,9 +568,8 @@ class MediaGenBase(AopUtil):
                 self.logger.log("Cleared SAVED_FILES table and added empty row", level='INFO')
                 
                 # Clear logs like Logger.clearlog pulse
-                logger_op = op('Logger')
-                if logger_op and hasattr(logger_op.ext.Logger, 'Clearlog'):
-                    logger_op.ext.Logger.Clearlog()
+                if self._logger_clearlog:
+                    self._logger_clearlog()
             else:
                 self.logger.log("SAVED_FILES table operator not found", level='WARNING')
         except Exception as e:
@@ -211,7 +584,7 @@ class MediaGenBase(AopUtil):
             prompt (str): The prompt used to generate the media
         """
         try:
-            saved_files_table = self.ownerComp.op('SAVED_FILES')
+            saved_files_table = self._get_op('SAVED_FILES')
             if saved_files_table:
                 # Get just the filename from the full path
                 filename = os.path.basename(filepath)
@@ -222,24 +595,51 @@ class MediaGenBase(AopUtil):
                 
                 # Insert new row with filename and prompt
                 saved_files_table.appendRow([filename, prompt])
-                self.logger.log(f"Added to SAVED_FILES table: {filename}", level='INFO')
+                last_row_index = saved_files_table.numRows - 1
                 
                 # Set Scroll cursor to the last row (newly added row)
-                scroll_op = self.ownerComp.op('Scroll')
+                scroll_op = self._get_op('Scroll')
                 if scroll_op:
-                    last_row_index = saved_files_table.numRows - 1
                     scroll_op.par.Cursor = last_row_index
-                    self.logger.log(f"Set Scroll cursor to row {last_row_index}", level='INFO')
+                
+                self.logger.log(f"Added to SAVED_FILES table: {filename} (cursor at row {last_row_index})", level='INFO')
             else:
                 self.logger.log("SAVED_FILES table operator not found", level='WARNING')
         except Exception as e:
             self.logger.log(f"Error adding to SAVED_FILES table: {e}", level='ERROR')
     
+    def GenerateBatch(self, prompts, completion_callback=None, **shared_params):
+        """
+        Submit one generation per prompt with shared settings.
+        Generations run concurrently up to MAX_CONCURRENT_GENERATIONS over the shared HTTP session;
+        unchanged reference images are encoded once and shared.
+        
+        Args:
+            prompts (list): Text prompts
+            completion_callback (callable, optional): Callback receiving each finished task object
+            **shared_params: Keyword arguments passed to Generate for every prompt (e.g. output_dir, aspect_ratio)
+            
+        Returns:
+            list: Task IDs of the submitted generations
+        """
+        task_ids = []
+        for prompt in prompts:
+            task_id = self.Generate(prompt=prompt, completion_callback=completion_callback, **shared_params)
+            if task_id is None:
+                # Validation failed (no model, missing reference image, ...); same for every prompt
+                break
+            task_ids.append(task_id)
+        
+        self.logger.log(f"Submitted batch of {len(task_ids)}/{len(prompts)} generation(s)", level='INFO')
+        return task_ids
+    
     def Stopgeneration(self):
         """Pulse callback for Stop Generation button - cancels all active generation tasks."""
         try:
             # Cancel all active tasks
-            self.tdAsyncIO.ext.AsyncIOManager.Cancelactive()
+            self._get_async_mgr().Cancelactive()
+            # Cancelled tasks don't run their completion callbacks, so forget them here
+            self._inflight.clear()
             
             # Update Active status to False
             self.ownerComp.par.Active = False
@@ -251,8 +651,10 @@ class MediaGenBase(AopUtil):
     
     def _update_active_status(self):
         """Update the Active parameter based on whether there are active tasks."""
-        active_tasks_count = self.tdAsyncIO.ext.AsyncIOManager.GetActiveTasksCount()
-        self.ownerComp.par.Active = active_tasks_count > 0
+        is_active = self._get_async_mgr().GetActiveTasksCount() > 0
+        # Only write the parameter when it changes (avoids TD dependency invalidation)
+        if is_active != bool(self.ownerComp.par.Active.eval()):
+            self.ownerComp.par.Active = is_active
     
     def _extract_provider_from_model_id(self, model_id):
         """
@@ -275,10 +677,33 @@ class MediaGenBase(AopUtil):
             media_type (str, optional): 'image' or 'video' to filter by type
             
         Returns:
-            list: List of model IDs for the provider
+            list: Sorted list of model IDs for the provider
         """
-        models_dict = get_models_by_provider(provider, media_type)
-        return list(models_dict.keys())
+        return list(self._provider_index.get((provider, media_type), ()))
+    
+    def _set_menu_items(self, par, items):
+        """
+        Set a menu parameter's names and labels, skipping the write when they are unchanged.
+        Assigning menuNames/menuLabels dirties the parameter even if the items are identical.
+        
+        Args:
+            par (Par): Menu parameter to update
+            items (sequence): Menu item names (also used as labels)
+            
+        Returns:
+            bool: True if the menu was rewritten, False if it already matched
+        """
+        items = list(items)
+        if list(par.menuNames) == items and list(par.menuLabels) == items:
+            return False
+        par.menuNames = items
+        par.menuLabels = items
+        return True
+    
+    def _set_read_only(self, par, read_only):
+        """Set a parameter's readOnly flag only when it changes."""
+        if par.readOnly != read_only:
+            par.readOnly = read_only
     
     def _update_model_menu(self, provider):
         """
@@ -295,23 +720,66 @@ class MediaGenBase(AopUtil):
         
         if not model_ids:
             # No models found, clear menu
-            self.ownerComp.par.Model.menuNames = []
-            self.ownerComp.par.Model.menuLabels = []
-            self.ownerComp.par.Model = ''
+            self._set_menu_items(self.ownerComp.par.Model, ())
+            if self.ownerComp.par.Model.eval() != '':
+                self.ownerComp.par.Model = ''
             return
         
-        # Sort model IDs for consistent ordering
-        model_ids.sort()
-        
-        # Update menu items
-        self.ownerComp.par.Model.menuNames = model_ids
-        self.ownerComp.par.Model.menuLabels = model_ids
+        # Update menu items (IDs come pre-sorted; no-op if the provider's models are already listed)
+        self._set_menu_items(self.ownerComp.par.Model, model_ids)
         
         # Set to first model if current selection is invalid
         current_model = self.ownerComp.par.Model.eval()
         if current_model not in model_ids:
             self.ownerComp.par.Model = model_ids[0]
     
+    def _get_model_config(self, model_id):
+        """
+        Get a model's configuration from the loaded registry (no JSON reload).
+        
+        Args:
+            model_id (str): Model identifier
+            
+        Returns:
+            dict: Model configuration, or None if not found
+        """
+        return self.registry.get(model_id)
+    
+    def _get_model_caps(self, model_id, model_config=None):
+        """
+        Get a model's precomputed parameter capabilities, building them on first use.
+        Unknown model IDs are cached as None so repeated lookups short-circuit.
+        
+        Args:
+            model_id (str): Model identifier
+            model_config (dict, optional): Already resolved registry entry
+            
+        Returns:
+            ModelCaps: Model capabilities, or None if the model is not in the registry
+        """
+        try:
+            return self._model_caps[model_id]
+        except KeyError:
+            pass
+        if model_config is None:
+            model_config = self._get_model_config(model_id)
+        caps = self._model_caps[model_id] = build_model_caps(model_config, model_id) if model_config else None
+        return caps
+    
+    def Clearregistrycache(self):
+        """Pulse callback - reload the model registry (e.g. after editing models_registry.json) and refresh the Model menu."""
+        self.registry = reload_registry()
+        # Rebuilt from the new registry on next access
+        self.__dict__.pop('model_detector', None)
+        self.__dict__.pop('_provider_index', None)
+        self._model_caps.clear()
+        self._last_provider = None
+        self._last_model_id = None
+        if hasattr(self.ownerComp.par, 'Provider'):
+            # Re-run the Provider callback so the menu and model-dependent parameters use the new registry
+            self.Provider()
+        self.logger.log(f"Reloaded model registry ({len(self.registry)} models)", level='INFO')
+    
     def _model_requires_reference(self, model_id):
         """
         Check if a model requires reference images based on registry.
@@ -322,8 +790,7 @@ class MediaGenBase(AopUtil):
         Returns:
             bool: True if model requires reference images, False otherwise
         """
-        registry = get_registry()
-        model_config = registry.get(model_id)
+        model_config = self._get_model_config(model_id)
         
         if not model_config:
             return False
@@ -331,43 +798,24 @@ class MediaGenBase(AopUtil):
         detection = model_config.get('detection', {})
         return detection.get('requires_reference', False)
     
-    def _model_supports_image_parameter(self, model_id):
+    def _model_supports_image_parameter(self, model_id, model_config=None):
         """
         Check if a model supports image parameters and whether they are required.
         
         Args:
             model_id (str): Model identifier
+            model_config (dict, optional): Already resolved registry entry (skips the registry lookup)
             
         Returns:
             tuple: (supports_image, is_required)
                 - supports_image (bool): Whether model supports image parameters
                 - is_required (bool): Whether image is required (defaults to False if not specified)
         """
-        registry = get_registry()
-        model_config = registry.get(model_id)
-        
-        if not model_config:
-            return (False, False)
-        
-        model_params = model_config.get('parameters', {})
-        
-        # Check for any image parameter
-        image_param_names = ['image_url', 'first_frame_image', 'image_urls']
-        image_param = None
-        for param_name in image_param_names:
-            if param_name in model_params:
-                image_param = model_params[param_name]
-                break
-        
-        if not image_param:
+        # Image slot and required flag are precomputed per model (see ModelCaps)
+        caps = self._get_model_caps(model_id, model_config)
+        if caps is None or caps.first_frame_slot is None:
             return (False, False)
-        
-        # Check if image is required (defaults to False if not specified)
-        is_required = False
-        if isinstance(image_param, dict):
-            is_required = image_param.get('required', False)
-        
-        return (True, is_required)
+        return (True, caps.first_frame_required)
     
     # Abstract methods to be implemented by subclasses
     def setup_parameters(self):
@@ -1,117 +1,74 @@
 from MediaGenBase import MediaGenBase
-from model_detector import ModelDetector
-from api_request_handler import APIRequestHandler
-from models_registry import get_registry
-import json
+import asyncio
 
 
 class VideoGen(MediaGenBase):
-
+    # Initial menu options (Duration, Resolution and Fps are replaced per model)
+    _PROVIDER_OPTIONS = ('Kling', 'Google', 'Ltxv', 'MiniMax', 'Alibaba Cloud', 'LumaAI', 'Runway')
+    _ASPECT_RATIO_OPTIONS = ('16:9', '9:16', '1:1')
+    _RESOLUTION_OPTIONS = ('1080p', '1440p', '2160p')
+    _FPS_OPTIONS = ('25', '50')
+    _DURATION_OPTIONS = ('5', '10')
+    
+    # Multi-reference models read REF_IN1 through REF_IN7
+    MAX_REFERENCE_IMAGES = 7
+    
+    # Custom parameters created by setup_parameters, in page order: (name, type, read_only, options)
+    # Resolution, Fps and Generateaudio start disabled and are enabled per model
+    _PARAM_SPEC = (
+        ('Active', 'bool', False, {'label': 'Active', 'default': False, 'order': 0,
+                                   'help_text': 'Indicates if video generation is in progress'}),
+        ('Provider', 'menu', False, {'label': 'Provider', 'order': 1, 'default': 'Kling',
+                                     'menu_items': _PROVIDER_OPTIONS,
+                                     'help_text': 'Select the AI provider'}),
+        # Model menu is populated by the Provider callback
+        ('Model', 'menu', False, {'label': 'Model', 'order': 2, 'default': '', 'menu_items': (),
+                                  'help_text': 'Select the model (updates based on provider selection)'}),
+        ('Aspectratio', 'menu', False, {'label': 'Aspect Ratio', 'default': '16:9',
+                                        'menu_items': _ASPECT_RATIO_OPTIONS,
+                                        'help_text': 'Video aspect ratio (default: 16:9)'}),
+        ('Resolution', 'menu', True, {'label': 'Resolution', 'default': '1080p',
+                                      'menu_items': _RESOLUTION_OPTIONS,
+                                      'help_text': 'Video resolution (default: 1080p)'}),
+        ('Fps', 'menu', True, {'label': 'FPS', 'default': '25', 'menu_items': _FPS_OPTIONS,
+                               'help_text': 'Frames per second (default: 25)'}),
+        ('Generateaudio', 'bool', True, {'label': 'Generate Audio', 'default': True,
+                                         'help_text': 'Whether to generate audio for the video (default: true)'}),
+        ('Duration', 'menu', False, {'label': 'Duration', 'default': '5', 'menu_items': _DURATION_OPTIONS,
+                                     'help_text': 'Video duration in seconds (default: 5)'}),
+        ('Cfgscale', 'float', False, {'label': 'CFG Scale', 'default': 0.9, 'norm_min': 0.0, 'norm_max': 1.0,
+                                      'help_text': 'Classifier Free Guidance scale (0-1, default: 0.9)'}),
+        ('Generate', 'pulse', False, {'label': 'Generate Video',
+                                      'help_text': 'Generate video using current settings'}),
+        ('Stopgeneration', 'pulse', False, {'label': 'Stop Generation',
+                                            'help_text': 'Stop all active video generation tasks'}),
+        ('Clearfiles', 'pulse', False, {'label': 'Clear Files',
+                                        'help_text': 'Clear all entries from SAVED_FILES table'}),
+        ('Clearregistrycache', 'pulse', False, {'label': 'Reload Registry',
+                                                'help_text': 'Reload the model registry (picks up models_registry.json changes)'}),
+    )
+    
     def __init__(self, ownerComp):
         # Initialize parent class first (with media_type='video')
         super().__init__(ownerComp, media_type='video')
         
         self.logger.log('VideoGen initialized', level='INFO')
         
-        # Initialize model detector and registry
-        self.registry = get_registry()
-        self.model_detector = ModelDetector(self.registry)
-        
         # Setup custom parameters
         self.setup_parameters()
 
     def setup_parameters(self):
-        """Create custom parameters for video generation settings."""
-        # Create Active parameter (first, bool type)
-        self.create_parameter('Active', 'bool', page='Config',
-                            label='Active',
-                            default=False,
-                            help_text='Indicates if video generation is in progress',
-                            order=0)
-        
-        # Create Provider parameter (menu with available providers)
-        provider_options = ['Kling', 'Google', 'Ltxv', 'MiniMax', 'Alibaba Cloud', 'LumaAI', 'Runway']
-        self.create_parameter('Provider', 'menu', page='Config',
-                            label='Provider',
-                            menu_items=provider_options,
-                            default='Kling',
-                            help_text='Select the AI provider',
-                            order=1)
-        
-        # Create Model parameter (menu, initially empty, populated by Provider callback)
-        self.create_parameter('Model', 'menu', page='Config',
-                            label='Model',
-                            menu_items=[],
-                            default='',
-                            help_text='Select the model (updates based on provider selection)',
-                            order=2)
-        
-        # Create Aspect Ratio parameter (menu based on video API docs)
-        aspect_ratio_options = ['16:9', '9:16', '1:1']
-        self.create_parameter('Aspectratio', 'menu', page='Config',
-                            label='Aspect Ratio',
-                            menu_items=aspect_ratio_options,
-                            default='16:9',
-                            help_text='Video aspect ratio (default: 16:9)')
-        
-        # Create Resolution parameter (menu, initially disabled, enabled for specific models)
-        resolution_options = ['1080p', '1440p', '2160p']
-        resolution_par = self.create_parameter('Resolution', 'menu', page='Config',
-                            label='Resolution',
-                            menu_items=resolution_options,
-                            default='1080p',
-                            help_text='Video resolution (default: 1080p)')
-        resolution_par.readOnly = True  # Initially disabled
-        
-        # Create Fps parameter (menu, initially disabled, enabled for specific models)
-        fps_options = ['25', '50']
-        fps_par = self.create_parameter('Fps', 'menu', page='Config',
-                            label='FPS',
-                            menu_items=fps_options,
-                            default='25',
-                            help_text='Frames per second (default: 25)')
-        fps_par.readOnly = True  # Initially disabled
-        
-        # Create Generateaudio parameter (bool, initially disabled, enabled for specific models)
-        generateaudio_par = self.create_parameter('Generateaudio', 'bool', page='Config',
-                            label='Generate Audio',
-                            default=True,
-                            help_text='Whether to generate audio for the video (default: true)')
-        generateaudio_par.readOnly = True  # Initially disabled
-        
-        # Create Duration parameter (menu based on API docs)
-        duration_options = ['5', '10']
-        self.create_parameter('Duration', 'menu', page='Config',
-                            label='Duration',
-                            menu_items=duration_options,
-                            default='5',
-                            help_text='Video duration in seconds (default: 5)')
-        
-        # Create CFG Scale parameter
-        self.create_parameter('Cfgscale', 'float', page='Config',
-                            label='CFG Scale',
-                            default=0.9,
-                            norm_min=0.0,
-                            norm_max=1.0,
-                            help_text='Classifier Free Guidance scale (0-1, default: 0.9)')
-        
-        # Create Generate pulse button
-        self.create_parameter('Generate', 'pulse', page='Config',
-                            label='Generate Video',
-                            help_text='Generate video using current settings')
-        
-        # Create Stop Generation pulse button
-        self.create_parameter('Stopgeneration', 'pulse', page='Config',
-                            label='Stop Generation',
-                            help_text='Stop all active video generation tasks')
-        
-        # Create Clear Files pulse button
-        self.create_parameter('Clearfiles', 'pulse', page='Config',
-                            label='Clear Files',
-                            help_text='Clear all entries from SAVED_FILES table')
-        
-        # Initialize model menu based on default provider
-        self.Provider()
+        """Create custom parameters for video generation settings from _PARAM_SPEC."""
+        # Par handles by name, so callbacks skip repeated ownerComp.par lookups and hasattr probes
+        self._pars = {}
+        for par_name, par_type, read_only, options in self._PARAM_SPEC:
+            par = self.create_parameter(par_name, par_type, page='Config', **options)
+            if read_only:
+                par.readOnly = True  # Initially disabled
+            self._pars[par_name] = par
+        
+        # Initialize model menu based on default provider (deferred so component load isn't blocked)
+        self._schedule_provider_refresh()
 
     def Provider(self):
         """
@@ -119,148 +76,115 @@ class VideoGen(MediaGenBase):
         Updates Model menu items based on selected provider.
         """
         provider = self.ownerComp.par.Provider.eval()
+        if provider == self._last_provider:
+            return
+        self._last_provider = provider
         self._update_model_menu(provider)
-        # Update duration options based on first model of provider (will be updated when model is selected)
-        self._update_duration_for_model()
-        # Update optional parameters based on selected model
-        self._update_optional_parameters()
+        # Update duration options and optional parameters based on first model of provider
+        # (will be updated when model is selected)
+        self.Model()
     
     def Model(self):
         """
         Callback method when Model parameter changes.
         Updates Duration menu options and optional parameters based on selected model's requirements.
         """
-        self._update_duration_for_model()
-        self._update_optional_parameters()
+        # Skip if this model was already applied (our own Duration/Model writes re-fire the callbacks)
+        model_id = self.ownerComp.par.Model.eval()
+        if model_id == self._last_model_id:
+            return
+        self._last_model_id = model_id
+        
+        # Resolve the selected model once for both updates
+        model_config = self._get_model_config(model_id) if model_id else None
+        self._update_duration_for_model(model_id, model_config)
+        self._update_optional_parameters(model_id, model_config)
     
-    def _update_duration_for_model(self):
+    def _update_duration_for_model(self, model_id, model_config):
         """
         Update Duration parameter menu options based on selected model.
-        """
-        model_id = self.ownerComp.par.Model.eval()
-        if not model_id:
-            # No model selected, use default options
-            return
         
-        model_config = self.registry.get(model_id)
-        if not model_config:
+        Args:
+            model_id (str): Selected model ID (may be empty)
+            model_config (dict): Model configuration, or None if not found
+        """
+        if not model_id or not model_config:
+            # No model selected (or unknown), keep current options
             return
         
-        # Get duration parameter from model config
-        model_params = model_config.get('parameters', {})
-        duration_param = model_params.get('duration')
-        
-        if duration_param and isinstance(duration_param, dict):
-            # Check if it's a menu type with options
-            if duration_param.get('type') == 'menu' and 'options' in duration_param:
-                duration_options = duration_param['options']
-                current_duration = str(self.ownerComp.par.Duration.eval())  # Convert to string for comparison
-                
-                # Update menu options
-                self.ownerComp.par.Duration.menuNames = duration_options
-                self.ownerComp.par.Duration.menuLabels = duration_options
-                
-                # If current duration is not in new options, set to first option
-                if current_duration not in duration_options:
-                    self.ownerComp.par.Duration = duration_options[0]
-                    self.logger.log(f"Updated Duration to {duration_options[0]} for model {model_id}", level='INFO')
+        caps = self._get_model_caps(model_id, model_config)
+        duration_options = caps.duration_options
+        if duration_options:
+            current_duration = self.ownerComp.par.Duration.eval()  # Menu value (string)
+            
+            # Update menu options (skipped if unchanged)
+            self._set_menu_items(self.ownerComp.par.Duration, duration_options)
+            
+            # If current duration is not in new options, set to first option
+            if current_duration not in caps.duration_option_set:
+                self.ownerComp.par.Duration = duration_options[0]
+                self.logger.log(f"Updated Duration to {duration_options[0]} for model {model_id}", level='INFO')
     
-    def _update_optional_parameters(self):
+    def _update_optional_parameters(self, model_id, model_config):
         """
         Update optional parameters (Resolution, Fps, Generateaudio) based on selected model.
         Enables/disables parameters and updates menu options based on model support.
-        """
-        model_id = self.ownerComp.par.Model.eval()
-        if not model_id:
-            # No model selected, disable all optional parameters
-            if hasattr(self.ownerComp.par, 'Resolution'):
-                self.ownerComp.par.Resolution.readOnly = True
-            if hasattr(self.ownerComp.par, 'Fps'):
-                self.ownerComp.par.Fps.readOnly = True
-            if hasattr(self.ownerComp.par, 'Generateaudio'):
-                self.ownerComp.par.Generateaudio.readOnly = True
-            return
         
-        model_config = self.registry.get(model_id)
-        if not model_config:
-            # Model not found, disable all optional parameters
-            if hasattr(self.ownerComp.par, 'Resolution'):
-                self.ownerComp.par.Resolution.readOnly = True
-            if hasattr(self.ownerComp.par, 'Fps'):
-                self.ownerComp.par.Fps.readOnly = True
-            if hasattr(self.ownerComp.par, 'Generateaudio'):
-                self.ownerComp.par.Generateaudio.readOnly = True
+        Args:
+            model_id (str): Selected model ID (may be empty)
+            model_config (dict): Model configuration, or None if not found
+        """
+        pars = self._pars
+        caps = self._get_model_caps(model_id, model_config) if model_id and model_config else None
+        if caps is None:
+            # No model selected or model not found, disable all optional parameters
+            for par_name in ('Resolution', 'Fps', 'Generateaudio'):
+                if par_name in pars:
+                    self._set_read_only(pars[par_name], True)
             return
         
-        model_params = model_config.get('parameters', {})
-        
-        # Update Resolution parameter
-        if hasattr(self.ownerComp.par, 'Resolution'):
-            if 'resolution' in model_params:
-                resolution_param = model_params['resolution']
-                # Enable parameter
-                self.ownerComp.par.Resolution.readOnly = False
-                
-                # Update menu options if it's a menu type
-                if isinstance(resolution_param, dict) and resolution_param.get('type') == 'menu' and 'options' in resolution_param:
-                    resolution_options = resolution_param['options']
-                    current_resolution = self.ownerComp.par.Resolution.eval()
-                    
-                    # Update menu options
-                    self.ownerComp.par.Resolution.menuNames = resolution_options
-                    self.ownerComp.par.Resolution.menuLabels = resolution_options
-                    
-                    # If current resolution is not in new options, set to first option or default
-                    if current_resolution not in resolution_options:
-                        new_value = resolution_param.get('default', resolution_options[0])
-                        self.ownerComp.par.Resolution = new_value
-                        self.logger.log(f"Updated Resolution to {new_value} for model {model_id}", level='INFO')
-            else:
+        # Update Resolution and Fps parameters (menus)
+        for par_name, param_caps in (('Resolution', caps.resolution), ('Fps', caps.fps)):
+            menu_par = pars.get(par_name)
+            if menu_par is None:
+                continue
+            if param_caps is None:
                 # Disable parameter if model doesn't support it
-                self.ownerComp.par.Resolution.readOnly = True
-        
-        # Update Fps parameter
-        if hasattr(self.ownerComp.par, 'Fps'):
-            if 'fps' in model_params:
-                fps_param = model_params['fps']
-                # Enable parameter
-                self.ownerComp.par.Fps.readOnly = False
+                self._set_read_only(menu_par, True)
+                continue
+            
+            # Enable parameter
+            self._set_read_only(menu_par, False)
+            
+            # Update menu options if it's a menu type (skipped if unchanged)
+            options = param_caps.options
+            if options:
+                current_value = menu_par.eval()
+                self._set_menu_items(menu_par, options)
                 
-                # Update menu options if it's a menu type
-                if isinstance(fps_param, dict) and fps_param.get('type') == 'menu' and 'options' in fps_param:
-                    fps_options = fps_param['options']
-                    current_fps = self.ownerComp.par.Fps.eval()
-                    
-                    # Update menu options
-                    self.ownerComp.par.Fps.menuNames = fps_options
-                    self.ownerComp.par.Fps.menuLabels = fps_options
-                    
-                    # If current fps is not in new options, set to first option or default
-                    if current_fps not in fps_options:
-                        new_value = fps_param.get('default', fps_options[0])
-                        self.ownerComp.par.Fps = new_value
-                        self.logger.log(f"Updated Fps to {new_value} for model {model_id}", level='INFO')
-            else:
-                # Disable parameter if model doesn't support it
-                self.ownerComp.par.Fps.readOnly = True
+                # If current value is not in new options, set to default or first option
+                if current_value not in param_caps.option_set:
+                    new_value = param_caps.default if param_caps.default is not None else options[0]
+                    menu_par.val = new_value
+                    self.logger.log(f"Updated {par_name} to {new_value} for model {model_id}", level='INFO')
         
         # Update Generateaudio parameter
-        if hasattr(self.ownerComp.par, 'Generateaudio'):
-            if 'generate_audio' in model_params:
-                audio_param = model_params['generate_audio']
+        audio_par = pars.get('Generateaudio')
+        if audio_par is not None:
+            audio_caps = caps.generate_audio
+            if audio_caps is not None:
                 # Check if parameter was previously disabled (before enabling it)
-                was_disabled = self.ownerComp.par.Generateaudio.readOnly
+                was_disabled = audio_par.readOnly
                 # Enable parameter
-                self.ownerComp.par.Generateaudio.readOnly = False
+                self._set_read_only(audio_par, False)
                 
                 # Set default if parameter was previously disabled
-                if was_disabled and isinstance(audio_param, dict) and 'default' in audio_param:
-                    default_value = audio_param.get('default', True)
-                    self.ownerComp.par.Generateaudio = default_value
-                    self.logger.log(f"Set Generateaudio to {default_value} for model {model_id}", level='INFO')
+                if was_disabled and audio_caps.default is not None:
+                    audio_par.val = audio_caps.default
+                    self.logger.log(f"Set Generateaudio to {audio_caps.default} for model {model_id}", level='INFO')
             else:
                 # Disable parameter if model doesn't support it
-                self.ownerComp.par.Generateaudio.readOnly = True
+                self._set_read_only(audio_par, True)
     
     def _detect_model(self):
         """
@@ -274,88 +198,62 @@ class VideoGen(MediaGenBase):
             return None
         return model_id
     
-    def _get_first_frame_image(self):
+    def _detect_model_and_first_frame(self):
         """
-        Get and encode the first frame image from REF_IN1 operator.
-        Uses base class method for encoding.
+        Resolve the selected model, its registry config and the first frame TOP in one pass.
+        The registry entry is looked up once and REF_IN1_ is only inspected if the model accepts an image.
         
         Returns:
-            str: Base64-encoded image data URI, or None if not found
+            tuple: (model_id, model_config, caps, first_frame_top, image_required)
+                - model_id (str): Model ID, or None if not set
+                - model_config (dict): Registry entry, or None if not found
+                - caps (ModelCaps): Precomputed capabilities, or None if not found
+                - first_frame_top (TOP): REF_IN1 operator, or None if unused or empty
+                - image_required (bool): Whether the model requires a reference image
         """
-        # Check if REF_IN1 exists and is not empty
-        if not self._check_ref_in1_exists():
-            return None
-        
-        # Get the non-resized version
-        ref_image = self.ownerComp.op('REF_IN1')
-        if not ref_image:
-            return None
+        model = self._detect_model()
+        if not model:
+            return (None, None, None, None, False)
         
-        # Use base class method to encode
-        data_uri = self._encode_image_to_base64(ref_image)
-        if data_uri:
-            self.logger.log("Collected first frame image from REF_IN1", level='INFO')
+        model_config = self._get_model_config(model)
+        caps = self._get_model_caps(model, model_config) if model_config else None
+        if caps is None or caps.multi_reference:
+            # Multi-reference models collect REF_IN1-7 separately
+            return (model, model_config, caps, None, False)
         
-        return data_uri
+        # Image slot and required flag come from caps (no parameter probing)
+        first_frame_top = self._get_first_frame_top() if caps.first_frame_slot else None
+        return (model, model_config, caps, first_frame_top, caps.first_frame_required)
     
-    def _get_last_frame_image(self):
+    def _get_first_frame_top(self):
         """
-        Get and encode the last frame image from REF_IN2 operator.
-        Uses base class method for encoding.
+        Get the first frame image TOP from REF_IN1 operator.
+        Encoding is deferred to the async generation task.
         
         Returns:
-            str: Base64-encoded image data URI, or None if not found
+            TOP: REF_IN1 operator, or None if not found or empty
         """
-        # Check if REF_IN2 exists and is not empty
-        if not self._check_ref_in2_exists():
+        # Check if REF_IN1 exists and is not empty
+        if not self._check_ref_in1_exists():
             return None
         
         # Get the non-resized version
-        ref_image = self.ownerComp.op('REF_IN2')
-        if not ref_image:
-            return None
-        
-        # Use base class method to encode
-        data_uri = self._encode_image_to_base64(ref_image)
-        if data_uri:
-            self.logger.log("Collected last frame image from REF_IN2", level='INFO')
-        
-        return data_uri
+        return self._get_op('REF_IN1')
     
-    def _get_multiple_reference_images(self):
+    def _get_last_frame_top(self):
         """
-        Collect and encode multiple reference images from REF_IN1 through REF_IN7.
-        Returns a list of base64-encoded image data URIs.
-        Used for models like klingai/video-o1-reference-to-video.
+        Get the last frame image TOP from REF_IN2 operator.
+        Encoding is deferred to the async generation task.
         
         Returns:
-            list: List of base64-encoded image data URIs (up to 7 images)
+            TOP: REF_IN2 operator, or None if not found or empty
         """
-        image_urls = []
-        max_images = 7  # REF_IN1 through REF_IN7
+        # Check if REF_IN2 exists and is not empty
+        if not self._check_ref_in2_exists():
+            return None
         
-        for i in range(1, max_images + 1):
-            # Check if REF_IN{i}_ exists and is not empty
-            if not self._check_ref_in_exists(i):
-                continue
-            
-            # Get the non-resized version
-            ref_image = self.ownerComp.op(f'REF_IN{i}')
-            if not ref_image:
-                continue
-            
-            try:
-                # Use base class method to encode
-                data_uri = self._encode_image_to_base64(ref_image)
-                if data_uri:
-                    image_urls.append(data_uri)
-                    self.logger.log(f"Collected reference image from REF_IN{i}", level='INFO')
-            except Exception as e:
-                self.logger.log(f"Error processing REF_IN{i}: {e}", level='ERROR')
-        
-        return image_urls
-
-
+        # Get the non-resized version
+        return self._get_op('REF_IN2')
     
     def _convert_parameter_value(self, param_name, value, param_def):
         """
@@ -392,7 +290,73 @@ class VideoGen(MediaGenBase):
             self.logger.log(f"Error converting parameter '{param_name}' to {api_type}: {e}. Using original value.", level='WARNING')
             return value
     
-    async def _generate_video_async(self, prompt, model, output_dir, duration, aspect_ratio, cfg_scale, first_frame_image=None, last_frame_image=None, multiple_images=None):
+    def _build_payload(self, model, prompt, caps, field_args, first_frame_image=None, last_frame_image=None, multiple_images=None):
+        """
+        Build the request payload for a model from its precomputed capabilities.
+        Only the fields and image slots listed in caps are touched (no registry probing).
+        
+        Args:
+            model (str): Model ID
+            prompt (str): The text prompt
+            caps (ModelCaps): Model capabilities from _get_model_caps
+            field_args (dict): Values for the fields passed to the generation (duration, aspect_ratio, cfg_scale)
+            first_frame_image (str, optional): First frame data URI
+            last_frame_image (str, optional): Last frame data URI
+            multiple_images (list, optional): Reference image data URIs (multi-reference models)
+            
+        Returns:
+            dict: Request payload
+        """
+        # Model and prompt are always sent
+        payload = {
+            'model': model,
+            'prompt': prompt
+        }
+        
+        # Add the optional fields the model supports
+        # Component parameters (Resolution, Fps, Generateaudio) are only sent when enabled for the model
+        for payload_key, par_name, param_def, cast in caps.payload_fields:
+            if par_name is None:
+                value = field_args[payload_key]
+            else:
+                field_par = self._pars.get(par_name)
+                if field_par is None or field_par.readOnly:
+                    continue
+                value = field_par.eval()
+            # Convert with the precomputed api_type cast; fall back to the logged conversion
+            if cast is not None and value is not None:
+                try:
+                    payload[payload_key] = cast(value)
+                    continue
+                except (ValueError, TypeError):
+                    pass
+            payload[payload_key] = self._convert_parameter_value(payload_key, value, param_def)
+        
+        # Handle multiple reference images (for klingai/video-o1-reference-to-video)
+        # This model uses image_url, image_url_2, ..., image_url_7
+        if multiple_images:
+            for i, (param_name, image_data) in enumerate(zip(caps.reference_slots, multiple_images), start=1):
+                if param_name and image_data:
+                    payload[param_name] = image_data
+                    self.logger.log(f"Reference image {i} prepared and included in request payload ({param_name})", level='INFO')
+        
+        # Handle first frame image (for image-to-video models)
+        # Different providers use different parameter names (first_frame_image, image_url or image_urls)
+        # Only include the parameter if we have an image (don't send empty/null values)
+        elif first_frame_image and caps.first_frame_slot:
+            param_name = caps.first_frame_slot
+            payload[param_name] = [first_frame_image] if caps.first_frame_as_list else first_frame_image
+            self.logger.log(f"Reference image prepared and included in request payload ({param_name})", level='INFO')
+        
+        # Handle last frame image (for models that support last_image_url or tail_image_url)
+        if last_frame_image:
+            for param_name in caps.last_frame_slots:
+                payload[param_name] = last_frame_image
+                self.logger.log(f"Last frame image prepared and included in request payload ({param_name})", level='INFO')
+        
+        return payload
+    
+    async def _generate_video_async(self, prompt, model, output_dir, duration, aspect_ratio, cfg_scale, first_frame_top=None, last_frame_top=None, multiple_tops=None, prompt_preview=None, image_required=False):
         """
         Main async method to generate a video from the AIMLAPI.
         Uses API request handler for unified request handling with polling.
@@ -404,127 +368,69 @@ class VideoGen(MediaGenBase):
             duration (int): Video duration in seconds
             aspect_ratio (str): Video aspect ratio
             cfg_scale (float): CFG scale
-            first_frame_image (str, optional): Base64-encoded image data URI for image-to-video
-            last_frame_image (str, optional): Base64-encoded image data URI for last frame
-            multiple_images (list, optional): List of base64-encoded image data URIs for multiple reference images
+            first_frame_top (TOP, optional): Reference image operator for image-to-video
+            last_frame_top (TOP, optional): Reference image operator for last frame
+            multiple_tops (list, optional): List of (index, TOP) tuples for multiple reference images
+            prompt_preview (str, optional): Truncated prompt for logging (computed if not given)
+            image_required (bool): Whether the model requires the first frame (an optional one that fails to encode is skipped)
             
         Returns:
             str: Path to the saved video file, or None if failed
         """
+        # Bind hot lookups to locals once
+        log = self.logger.log
+        
         try:
-            # Get API key from AOP
-            api_key = op.AOP.Getkey('aimlapi')
+            # Shared API request handler (API key is looked up on first use)
+            api_handler = self._get_api_handler()
             
             # Get model configuration from registry
-            model_config = self.registry.get(model)
+            model_config = self._get_model_config(model)
             if not model_config:
                 error_msg = f"Model {model} not found in registry"
-                self.logger.log(error_msg, level='ERROR')
+                log(error_msg, level='ERROR')
                 return None
             
-            # Initialize API request handler
-            api_handler = APIRequestHandler(api_key, self.logger)
-            
-            # Build payload from model config and parameters
-            # Only include parameters that are defined in the model config
-            payload = {
-                'model': model,
-                'prompt': prompt
-            }
-            
-            # Get model parameters to check what's supported
-            model_params = model_config.get('parameters', {})
-            
-            # Add duration if model supports it
-            if 'duration' in model_params:
-                duration_param = model_params['duration']
-                # Use api_type from parameter definition to convert value
-                payload['duration'] = self._convert_parameter_value('duration', duration, duration_param)
-            
-            # Add aspect_ratio if model supports it
-            if 'aspect_ratio' in model_params:
-                aspect_ratio_param = model_params['aspect_ratio']
-                # Use api_type from parameter definition to convert value
-                payload['aspect_ratio'] = self._convert_parameter_value('aspect_ratio', aspect_ratio, aspect_ratio_param)
-            
-            # Add cfg_scale only if model supports it
-            if 'cfg_scale' in model_params:
-                cfg_scale_param = model_params['cfg_scale']
-                # Use api_type from parameter definition to convert value
-                payload['cfg_scale'] = self._convert_parameter_value('cfg_scale', cfg_scale, cfg_scale_param)
-            
-            # Add resolution if model supports it AND parameter exists and is enabled (e.g., Ltxv)
-            if 'resolution' in model_params:
-                if hasattr(self.ownerComp.par, 'Resolution') and not self.ownerComp.par.Resolution.readOnly:
-                    resolution_value = self.ownerComp.par.Resolution.eval()
-                    resolution_param = model_params['resolution']
-                    # Use api_type from parameter definition to convert value
-                    payload['resolution'] = self._convert_parameter_value('resolution', resolution_value, resolution_param)
-            
-            # Add fps if model supports it AND parameter exists and is enabled
-            # NOTE: Explicitly exclude Ltxv models as API doesn't support these parameters
-            if 'fps' in model_params and not model.startswith('ltxv/'):
-                if hasattr(self.ownerComp.par, 'Fps') and not self.ownerComp.par.Fps.readOnly:
-                    fps_value = self.ownerComp.par.Fps.eval()
-                    fps_param = model_params['fps']
-                    # Use api_type from parameter definition to convert value
-                    payload['fps'] = self._convert_parameter_value('fps', fps_value, fps_param)
-            
-            # Add generate_audio if model supports it AND parameter exists and is enabled
-            # NOTE: Explicitly exclude Ltxv models as API doesn't support these parameters
-            if 'generate_audio' in model_params and not model.startswith('ltxv/'):
-                if hasattr(self.ownerComp.par, 'Generateaudio') and not self.ownerComp.par.Generateaudio.readOnly:
-                    audio_value = self.ownerComp.par.Generateaudio.eval()
-                    audio_param = model_params['generate_audio']
-                    # Use api_type from parameter definition to convert value
-                    payload['generate_audio'] = self._convert_parameter_value('generate_audio', audio_value, audio_param)
-            
-            # Handle multiple reference images (for klingai/video-o1-reference-to-video)
-            # This model uses image_url, image_url_2, ..., image_url_7
-            if multiple_images and len(multiple_images) > 0:
-                # Map images to image_url, image_url_2, ..., image_url_7
-                for i, image_data in enumerate(multiple_images, start=1):
-                    if i == 1:
-                        param_name = 'image_url'
-                    else:
-                        param_name = f'image_url_{i}'
-                    
-                    if param_name in model_params and image_data:
-                        payload[param_name] = image_data
-                        self.logger.log(f"Reference image {i} prepared and included in request payload ({param_name})", level='INFO')
-            
-            # Handle first frame image (for image-to-video models)
-            # Different providers use different parameter names
-            # Only include the parameter if we have an image (don't send empty/null values)
-            if not multiple_images:  # Only handle single image if not using multiple images
-                if 'first_frame_image' in model_params:
-                    if first_frame_image:
-                        payload['first_frame_image'] = first_frame_image
-                        self.logger.log("Reference image prepared and included in request payload (first_frame_image)", level='INFO')
-                elif 'image_url' in model_params:
-                    if first_frame_image:
-                        payload['image_url'] = first_frame_image
-                        self.logger.log("Reference image prepared and included in request payload (image_url)", level='INFO')
-                elif 'image_urls' in model_params:
-                    if first_frame_image:
-                        payload['image_urls'] = [first_frame_image]
-                        self.logger.log("Reference image prepared and included in request payload (image_urls)", level='INFO')
-            
-            # Handle last frame image (for models that support last_image_url or tail_image_url)
-            if 'last_image_url' in model_params:
+            # Encode reference images in one concurrent batch (a missing TOP encodes to None)
+            # TOPs are captured on the main thread; file read and base64 run in the executor
+            first_frame_image = None
+            last_frame_image = None
+            multiple_images = None
+            if first_frame_top or last_frame_top or multiple_tops:
+                encode = self._encode_image_to_base64_async
+                first_frame_image, last_frame_image, *reference_images = await asyncio.gather(
+                    encode(first_frame_top),
+                    encode(last_frame_top),
+                    *(encode(ref_image) for _, ref_image in multiple_tops or ())
+                )
+                if multiple_tops:
+                    multiple_images = self._collect_reference_images(multiple_tops, reference_images)
+                    if not multiple_images:
+                        log(f"Model {model} requires at least one reference image, but none could be encoded.", level='ERROR')
+                        return None
+                if first_frame_image:
+                    log("Collected first frame image from REF_IN1", level='INFO')
+                elif first_frame_top:
+                    if image_required:
+                        log(f"Model {model} requires a reference image, but REF_IN1 could not be encoded.", level='ERROR')
+                        return None
+                    log("Could not encode the optional first frame image from REF_IN1, generating without it", level='WARNING')
                 if last_frame_image:
-                    payload['last_image_url'] = last_frame_image
-                    self.logger.log("Last frame image prepared and included in request payload (last_image_url)", level='INFO')
+                    log("Collected last frame image from REF_IN2", level='INFO')
             
-            if 'tail_image_url' in model_params:
-                if last_frame_image:
-                    payload['tail_image_url'] = last_frame_image
-                    self.logger.log("Last frame image prepared and included in request payload (tail_image_url)", level='INFO')
+            # Build payload from the model's precomputed fields and image slots (see ModelCaps)
+            # Only include parameters that are defined in the model config
+            payload = self._build_payload(
+                model, prompt, self._get_model_caps(model, model_config),
+                {'duration': duration, 'aspect_ratio': aspect_ratio, 'cfg_scale': cfg_scale},
+                first_frame_image, last_frame_image, multiple_images
+            )
             
             # Truncate prompt for logging (don't log whole prompt)
-            prompt_preview = prompt[:50] + '...' if len(prompt) > 50 else prompt
-            self.logger.log(f"Creating video task with prompt: '{prompt_preview}'", level='INFO')
-            self.logger.log(f"Using model: {model}", level='INFO')
+            if prompt_preview is None:
+                prompt_preview, _ = self._describe_prompt(prompt)
+            log(f"Creating video task with prompt: '{prompt_preview}'", level='INFO')
+            log(f"Using model: {model}", level='INFO')
             
             # Step 1: Create video generation task
             response_data = await api_handler.create_generation_task(model_config, payload)
@@ -535,11 +441,11 @@ class VideoGen(MediaGenBase):
             # Extract generation ID
             generation_id = api_handler.extract_generation_id(response_data)
             if not generation_id:
-                error_msg = "No generation ID in response: " + json.dumps(response_data, indent=2)
-                self.logger.log(error_msg, level='ERROR')
+                error_msg = "No generation ID in response: " + api_handler.format_json(response_data)
+                log(error_msg, level='ERROR')
                 return None
             
-            self.logger.log(f"Video task created with ID: {generation_id}", level='INFO')
+            log(f"Video task created with ID: {generation_id}", level='INFO')
             
             # Step 2: Poll for video result
             poll_response = await api_handler.poll_generation_result(model_config, generation_id)
@@ -550,8 +456,8 @@ class VideoGen(MediaGenBase):
             # Extract video URL from poll response
             video_url = api_handler.extract_media_url(poll_response, media_type='video')
             if not video_url:
-                error_msg = "No video URL in completed response: " + json.dumps(poll_response, indent=2)
-                self.logger.log(error_msg, level='ERROR')
+                error_msg = "No video URL in completed response: " + api_handler.format_json(poll_response)
+                log(error_msg, level='ERROR')
                 return None
             
             # Step 3: Download and save the video
@@ -568,7 +474,7 @@ class VideoGen(MediaGenBase):
                         
         except Exception as e:
             error_msg = f"Unexpected error during video generation: {e}"
-            self.logger.log(error_msg, level='ERROR')
+            log(error_msg, level='ERROR')
             return None
 
     def Generate(self, prompt=None, output_dir=None, aspect_ratio=None, duration=None, cfg_scale=None, completion_callback=None):
@@ -588,90 +494,95 @@ class VideoGen(MediaGenBase):
         Returns:
             int: Task ID for tracking the async operation, or None if validation fails
         """
+        par = self.ownerComp.par
+        
         # Use parameters from component if not provided
         if prompt is None:
             # Get prompt from PROMPT operator (uses base class method)
             prompt = self._get_prompt_from_operator()
         
-        # Get selected model from parameter
-        model = self._detect_model()
+        # Get selected model, its configuration and the first frame image in one pass
+        model, model_config, caps, first_frame_top, image_required = self._detect_model_and_first_frame()
         if not model:
             error_msg = "No model selected. Please select a model from the Model parameter."
             self.logger.log(error_msg, level='ERROR')
             return None
         
-        # Get model configuration to check for specific parameter support
-        model_config = self.registry.get(model)
         if not model_config:
             error_msg = f"Model {model} not found in registry"
             self.logger.log(error_msg, level='ERROR')
             return None
         
-        model_params = model_config.get('parameters', {})
+        # Check if this is a multiple reference images model (e.g. klingai/video-o1-reference-to-video)
+        # Reference TOPs are resolved here; encoding happens in the async task
+        multiple_tops = None
+        last_frame_top = None
         
-        # Check if this is the multiple reference images model (klingai/video-o1-reference-to-video)
-        multiple_images = None
-        first_frame_image = None
-        last_frame_image = None
-        
-        if model == 'klingai/video-o1-reference-to-video':
+        if caps.multi_reference:
             # Collect multiple reference images from REF_IN1-7
-            multiple_images = self._get_multiple_reference_images()
-            if not multiple_images or len(multiple_images) == 0:
+            multiple_tops = self._collect_reference_tops(self.MAX_REFERENCE_IMAGES)
+            if not multiple_tops:
                 error_msg = f"Model {model} requires at least one reference image, but none were found. Please provide reference images in REF_IN1-REF_IN7."
                 self.logger.log(error_msg, level='ERROR')
                 return None
-            self.logger.log(f"Using {len(multiple_images)} reference image(s) from REF_IN1-REF_IN7 for model {model}", level='INFO')
+            self.logger.log(f"Using {len(multiple_tops)} reference image(s) from REF_IN1-REF_IN7 for model {model}", level='INFO')
         else:
-            # Check if model supports image parameters
-            supports_image, is_required = self._model_supports_image_parameter(model)
-            
-            # Get first frame image if model supports it (required or optional)
-            if supports_image:
-                first_frame_image = self._get_first_frame_image()
-                if is_required and not first_frame_image:
-                    error_msg = f"Model {model} requires a reference image, but none was found. Please provide a reference image in REF_IN1."
-                    self.logger.log(error_msg, level='ERROR')
-                    return None
-                elif first_frame_image:
-                    self.logger.log(f"Using reference image from REF_IN1 for model {model}", level='INFO')
+            # First frame image was resolved with the model (required or optional)
+            if image_required and not first_frame_top:
+                error_msg = f"Model {model} requires a reference image, but none was found. Please provide a reference image in REF_IN1."
+                self.logger.log(error_msg, level='ERROR')
+                return None
+            elif first_frame_top:
+                self.logger.log(f"Using reference image from REF_IN1 for model {model}", level='INFO')
             
             # Check if model supports last frame image (last_image_url or tail_image_url)
-            if 'last_image_url' in model_params or 'tail_image_url' in model_params:
-                last_frame_image = self._get_last_frame_image()
-                if last_frame_image:
+            if caps.last_frame_slots:
+                last_frame_top = self._get_last_frame_top()
+                if last_frame_top:
                     self.logger.log(f"Using last frame image from REF_IN2 for model {model}", level='INFO')
         
         # Get output directory from global AOP parameter
         if output_dir is None:
             output_dir = op.AOP.par.Outputdir.eval()
-        aspect_ratio = aspect_ratio if aspect_ratio is not None else self.ownerComp.par.Aspectratio.eval()
-        duration = duration if duration is not None else int(self.ownerComp.par.Duration.eval())
-        cfg_scale = cfg_scale if cfg_scale is not None else float(self.ownerComp.par.Cfgscale.eval())
+        aspect_ratio = aspect_ratio if aspect_ratio is not None else par.Aspectratio.eval()
+        duration = duration if duration is not None else int(par.Duration.eval())
+        cfg_scale = cfg_scale if cfg_scale is not None else float(par.Cfgscale.eval())
+        
+        # Reuse the running task if an identical request is already in flight
+        inflight_key = (prompt, model, output_dir, duration, aspect_ratio, cfg_scale,
+                        self._top_signature(first_frame_top) if first_frame_top else None,
+                        self._top_signature(last_frame_top) if last_frame_top else None,
+                        tuple((i, self._top_signature(top)) for i, top in multiple_tops) if multiple_tops else None)
+        existing_task_id = self._find_inflight_task(inflight_key)
+        if existing_task_id is not None:
+            return existing_task_id
         
         # Set Active to True when starting generation
-        self.ownerComp.par.Active = True
+        par.Active = True
         
         # Create completion callback that updates Active status
         def on_completion(task):
+            self._inflight.pop(inflight_key, None)
             # Check if there are any active tasks remaining
             self._update_active_status()
             # Call user's completion callback if provided
             if completion_callback:
                 completion_callback(task)
         
+        # Truncated prompt shared by the task info and the coroutine's logging
+        prompt_preview, _ = self._describe_prompt(prompt)
+        
         # Create the async coroutine
-        coro = self._generate_video_async(prompt, model, output_dir, duration, aspect_ratio, cfg_scale, first_frame_image, last_frame_image, multiple_images)
+        coro = self._generate_video_async(prompt, model, output_dir, duration, aspect_ratio, cfg_scale, first_frame_top, last_frame_top, multiple_tops, prompt_preview, image_required)
         
-        # Run it through the async manager
-        task_id = self.tdAsyncIO.ext.AsyncIOManager.Run(
-            coro,
-            description=f"Generate Video: {prompt[:50]}...",
-            info={'prompt': prompt[:50] + '...' if len(prompt) > 50 else prompt, 'model': model, 'output_dir': output_dir},
+        # Run it through the async manager (bounded by the per-component concurrency limit)
+        task_id = self._get_async_mgr().Run(
+            self._run_limited(coro),
+            description=f"Generate Video: {prompt_preview}",
+            info={'prompt': prompt_preview, 'model': model, 'output_dir': output_dir},
             completion_callback=on_completion
         )
+        if task_id is not None:
+            self._inflight[inflight_key] = task_id
         
         return task_id
-    
-        
-        
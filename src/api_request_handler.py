@@ -8,7 +8,27 @@ import aiohttp
 import json
 import base64
 import asyncio
+import os
+import random
 import time
+import uuid
+
+# Optional non-blocking file writes for downloads; fall back to regular file I/O
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+# Prefer orjson for request/response bodies (serializes straight to bytes); fall back to stdlib json
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj, default=None):
+        return json.dumps(obj, default=default).encode('utf-8')
+    
+    _json_loads = json.loads
 
 
 class APIRequestHandler:
@@ -16,40 +36,131 @@ class APIRequestHandler:
     
     BASE_URL = 'https://api.aimlapi.com'
     
-    def __init__(self, api_key, logger=None):
+    # Constant headers shared by every request (Authorization is added per key)
+    BASE_HEADERS = {
+        'Content-Type': 'application/json'
+    }
+    
+    # Connection pool settings for the shared session
+    CONNECTOR_LIMIT = 16
+    CONNECTOR_LIMIT_PER_HOST = 8
+    # Default cap on concurrent create/poll API requests per handler (downloads are not counted)
+    MAX_CONCURRENT_REQUESTS = 8
+    KEEPALIVE_TIMEOUT = 60
+    # Seconds to cache DNS lookups (aiohttp's default is 10, which re-resolves on most polls)
+    DNS_CACHE_TTL = 300
+    # Bounded connect/read so a cancelled or stalled request releases its pooled connection quickly
+    REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
+    # Immediate-response models generate during the POST, so the server can stay silent for a long time
+    IMMEDIATE_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=300, sock_connect=10)
+    
+    # Polling backoff: start short, grow geometrically up to the model's poll_interval (at most POLL_MAX_DELAY)
+    POLL_INITIAL_DELAY = 1.0
+    POLL_BACKOFF_FACTOR = 1.5
+    POLL_MAX_DELAY = 10.0
+    # Random extra fraction added to each backoff delay so concurrent polls don't fire in lockstep
+    POLL_JITTER = 0.1
+    # Poll responses that mean "try again later" rather than failure
+    POLL_RETRY_STATUSES = (429, 503)
+    
+    # Chunk size for streaming downloads to disk (1 MiB keeps per-chunk write/thread overhead low for videos)
+    DOWNLOAD_CHUNK_SIZE = 1 << 20
+    
+    # Maximum characters of a JSON payload/response included in error messages
+    MAX_LOG_JSON_CHARS = 2000
+    
+    # Full URLs by endpoint path, resolved once and shared by all handlers (see build_url)
+    _URL_CACHE = {}
+    
+    def __init__(self, api_key, logger=None, max_concurrent=None):
         """
         Initialize the API request handler.
         
         Args:
             api_key (str): AIMLAPI API key
             logger: Logger instance (optional)
+            max_concurrent (int, optional): Maximum concurrent create/poll requests (default MAX_CONCURRENT_REQUESTS)
         """
         self.api_key = api_key
+        self.max_concurrent = max_concurrent or self.MAX_CONCURRENT_REQUESTS
         self.logger = logger if logger else print
+        # Log dispatch resolved once: Logger-style objects get levels, plain callables only see errors
+        if hasattr(self.logger, 'log'):
+            self._log_error = lambda msg: self.logger.log(msg, level='ERROR')
+            self._log_info = lambda msg: self.logger.log(msg, level='INFO')
+        else:
+            self._log_error = self.logger
+            self._log_info = lambda msg: None
         self.headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
+            **self.BASE_HEADERS,
+            'Authorization': f'Bearer {api_key}'
         }
+        # Shared session, created lazily inside the running event loop
+        self._session = None
+        self._session_loop = None
+        # Bounds in-flight API requests, created with the session (see _get_session)
+        self._request_sem = None
     
-    def build_url(self, model_config):
+    async def _get_session(self):
+        """
+        Get the shared aiohttp session, creating it on first use.
+        Reusing one session keeps connections alive across create/poll/download requests
+        and across generations. A new session is created if the event loop was replaced.
+        
+        Returns:
+            aiohttp.ClientSession: Shared client session
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session_loop = loop
+            connector = aiohttp.TCPConnector(limit=self.CONNECTOR_LIMIT, limit_per_host=self.CONNECTOR_LIMIT_PER_HOST,
+                                             keepalive_timeout=self.KEEPALIVE_TIMEOUT, ttl_dns_cache=self.DNS_CACHE_TTL)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.REQUEST_TIMEOUT)
+            # Semaphores bind to the loop they are first used in, so replace it along with the session
+            self._request_sem = asyncio.Semaphore(self.max_concurrent)
+        return self._session
+    
+    async def close(self):
+        """Close the shared aiohttp session and release pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
+    @classmethod
+    def format_json(cls, data):
+        """
+        Serialize data compactly for error messages, truncated to MAX_LOG_JSON_CHARS.
+        Payloads may carry base64 images, so they are never pretty-printed in full.
+        
+        Args:
+            data: JSON-serializable object
+        
+        Returns:
+            str: Compact (possibly truncated) JSON string
+        """
+        text = _json_dumps(data, default=str).decode('utf-8')
+        if len(text) > cls.MAX_LOG_JSON_CHARS:
+            return f"{text[:cls.MAX_LOG_JSON_CHARS]}... ({len(text)} chars)"
+        return text
+    
+    def build_url(self, model_config, endpoint_override=None):
         """
         Build the correct URL based on endpoint type.
         
         Args:
             model_config (dict): Model configuration from registry
-            
+            endpoint_override (str, optional): Endpoint path to use instead of model_config['endpoint']
+        
         Returns:
             str: Full API URL
         """
-        endpoint = model_config['endpoint']
-        endpoint_type = model_config.get('endpoint_type', 'standard')
-        
-        if endpoint_type == 'provider':
-            # Provider-specific endpoint (already full path)
-            return f"{self.BASE_URL}{endpoint}"
-        else:
-            # Standard endpoint
-            return f"{self.BASE_URL}{endpoint}"
+        endpoint = endpoint_override or model_config['endpoint']
+        # Standard and provider-specific endpoints are both full paths under BASE_URL
+        url = self._URL_CACHE.get(endpoint)
+        if url is None:
+            url = self._URL_CACHE[endpoint] = f"{self.BASE_URL}{endpoint}"
+        return url
     
     async def create_generation_task(self, model_config, payload):
         """
@@ -58,7 +169,7 @@ class APIRequestHandler:
         Args:
             model_config (dict): Model configuration from registry
             payload (dict): Request payload
-            
+        
         Returns:
             dict: Response data, or None if failed
         """
@@ -69,31 +180,47 @@ class APIRequestHandler:
             # Add model ID to payload if not present
             payload['model'] = model_config.get('id', list(model_config.keys())[0] if isinstance(model_config, dict) else None)
         
+        timeout = self.IMMEDIATE_REQUEST_TIMEOUT if model_config.get('response_type') == 'immediate' else self.REQUEST_TIMEOUT
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=self.headers) as response:
-                    # Accept both 200 (OK) and 201 (Created) as success
-                    if response.status in [200, 201]:
-                        response_data = await response.json()
-                        return response_data
-                    else:
-                        error_text = await response.text()
-                        payload_str = json.dumps(payload, indent=2)
-                        error_msg = f"Error creating generation task: HTTP {response.status}\nRequest Payload: {payload_str}\nResponse: {error_text}"
-                        if hasattr(self.logger, 'log'):
-                            self.logger.log(error_msg, level='ERROR')
-                        else:
-                            self.logger(error_msg)
-                        return None
+            session = await self._get_session()
+            async with self._request_sem, session.post(url, data=_json_dumps(payload), headers=self.headers, timeout=timeout) as response:
+                # Accept both 200 (OK) and 201 (Created) as success
+                if response.status in [200, 201]:
+                    response_data = _json_loads(await response.read())
+                    return response_data
+                else:
+                    error_text = await response.text()
+                    payload_str = self.format_json(payload)
+                    error_msg = f"Error creating generation task: HTTP {response.status}\nRequest Payload: {payload_str}\nResponse: {error_text}"
+                    self._log_error(error_msg)
+                    return None
         except Exception as e:
-            payload_str = json.dumps(payload, indent=2)
+            payload_str = self.format_json(payload)
             error_msg = f"Unexpected error creating generation task: {e}\nRequest Payload: {payload_str}"
-            if hasattr(self.logger, 'log'):
-                self.logger.log(error_msg, level='ERROR')
-            else:
-                self.logger(error_msg)
+            self._log_error(error_msg)
             return None
     
+    def _retry_after(self, response, default):
+        """
+        Get the wait before the next poll, honoring a Retry-After header (in seconds) if present.
+        Without one, the backoff delay is used with up to POLL_JITTER added.
+        
+        Args:
+            response (aiohttp.ClientResponse): Poll response
+            default (float): Backoff delay to use without a usable header
+        
+        Returns:
+            float: Seconds to wait
+        """
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return default * (1.0 + random.uniform(0.0, self.POLL_JITTER))
+    
     async def poll_generation_result(self, model_config, generation_id):
         """
         Poll for generation result (GET request).
@@ -101,95 +228,101 @@ class APIRequestHandler:
         Args:
             model_config (dict): Model configuration from registry
             generation_id (str): Generation ID from task creation
-            
+        
         Returns:
             dict: Response data with status and result, or None if failed/timed out
         """
-        endpoint = model_config.get('poll_endpoint', model_config['endpoint'])
-        poll_config = {**model_config, 'endpoint': endpoint}
-        url = self.build_url(poll_config)
+        url = self.build_url(model_config, endpoint_override=model_config.get('poll_endpoint'))
         
         timeout = model_config.get('poll_timeout', 1000)
-        poll_interval = model_config.get('poll_interval', 10)
-        start_time = time.time()
+        # poll_interval is the ceiling of the exponential backoff
+        poll_interval = min(model_config.get('poll_interval', 10), self.POLL_MAX_DELAY)
+        delay = min(self.POLL_INITIAL_DELAY, poll_interval)
+        # Monotonic deadline: immune to wall-clock adjustments
+        deadline = time.monotonic() + timeout
         
         # Determine poll method (GET by default)
         poll_method = model_config.get('poll_method', 'GET')
+        # GET polls revalidate with the last ETag; a 304 means no change, so there's nothing to decode
+        poll_headers = self.headers
         
         try:
-            async with aiohttp.ClientSession() as session:
-                while True:
-                    # Check timeout
-                    elapsed = time.time() - start_time
-                    if elapsed > timeout:
-                        error_msg = f"Generation timeout after {timeout} seconds"
-                        if hasattr(self.logger, 'log'):
-                            self.logger.log(error_msg, level='ERROR')
-                        else:
-                            self.logger(error_msg)
-                        return None
-                    
-                    # Poll for result
-                    params = {'generation_id': generation_id}
-                    
+            session = await self._get_session()
+            while True:
+                # Check timeout
+                if time.monotonic() > deadline:
+                    error_msg = f"Generation timeout after {timeout} seconds"
+                    self._log_error(error_msg)
+                    return None
+                
+                # Poll for result
+                params = {'generation_id': generation_id}
+                
+                # Only the request holds a slot (and its pooled connection); the backoff sleep happens outside
+                async with self._request_sem:
                     if poll_method == 'GET':
-                        async with session.get(url, headers=self.headers, params=params) as response:
-                            if response.status == 200:
-                                response_data = await response.json()
+                        async with session.get(url, headers=poll_headers, params=params) as response:
+                            if response.status == 304:
+                                # Status unchanged since the last poll
+                                wait = self._retry_after(response, delay)
+                            elif response.status == 200:
+                                etag = response.headers.get('ETag')
+                                if etag and 'no-cache' not in response.headers.get('Cache-Control', ''):
+                                    poll_headers = {**self.headers, 'If-None-Match': etag}
+                                else:
+                                    poll_headers = self.headers
+                                response_data = _json_loads(await response.read())
                                 status = response_data.get('status', '')
-                                
-                                if hasattr(self.logger, 'log'):
-                                    self.logger.log(f"Generation status: {status}", level='INFO')
-                                
+                            
+                                self._log_info(f"Generation status: {status}")
+                            
                                 if status == 'completed':
                                     return response_data
                                 elif status in ['waiting', 'active', 'queued', 'generating']:
-                                    # Continue polling
-                                    await asyncio.sleep(poll_interval)
+                                    # Continue polling with exponential backoff (or the server's Retry-After hint)
+                                    wait = self._retry_after(response, delay)
                                 else:
                                     # Error or unknown status
-                                    error_msg = f"Generation failed with status: {status}. Response: {json.dumps(response_data, indent=2)}"
-                                    if hasattr(self.logger, 'log'):
-                                        self.logger.log(error_msg, level='ERROR')
-                                    else:
-                                        self.logger(error_msg)
+                                    error_msg = f"Generation failed with status: {status}. Response: {self.format_json(response_data)}"
+                                    self._log_error(error_msg)
                                     return None
+                            elif response.status in self.POLL_RETRY_STATUSES:
+                                # Rate limited or temporarily unavailable: back off and poll again
+                                wait = self._retry_after(response, delay)
                             else:
                                 error_text = await response.text()
                                 error_msg = f"Error polling generation result: HTTP {response.status}\nResponse: {error_text}"
-                                if hasattr(self.logger, 'log'):
-                                    self.logger.log(error_msg, level='ERROR')
-                                else:
-                                    self.logger(error_msg)
+                                self._log_error(error_msg)
                                 return None
                     else:
                         # POST method for polling (if needed)
-                        async with session.post(url, headers=self.headers, json=params) as response:
+                        async with session.post(url, headers=self.headers, data=_json_dumps(params)) as response:
                             if response.status == 200:
-                                response_data = await response.json()
+                                response_data = _json_loads(await response.read())
                                 status = response_data.get('status', '')
-                                
+                            
                                 if status == 'completed':
                                     return response_data
                                 elif status in ['waiting', 'active', 'queued', 'generating']:
-                                    await asyncio.sleep(poll_interval)
+                                    wait = self._retry_after(response, delay)
                                 else:
                                     error_msg = f"Generation failed with status: {status}"
-                                    if hasattr(self.logger, 'log'):
-                                        self.logger.log(error_msg, level='ERROR')
+                                    self._log_error(error_msg)
                                     return None
+                            elif response.status in self.POLL_RETRY_STATUSES:
+                                # Rate limited or temporarily unavailable: back off and poll again
+                                wait = self._retry_after(response, delay)
                             else:
                                 error_text = await response.text()
                                 error_msg = f"Error polling: HTTP {response.status}"
-                                if hasattr(self.logger, 'log'):
-                                    self.logger.log(error_msg, level='ERROR')
+                                self._log_error(error_msg)
                                 return None
+                
+                await asyncio.sleep(wait)
+                delay = min(delay * self.POLL_BACKOFF_FACTOR, poll_interval)
         except Exception as e:
             error_msg = f"Unexpected error polling generation result: {e}"
-            if hasattr(self.logger, 'log'):
-                self.logger.log(error_msg, level='ERROR')
-            else:
-                self.logger(error_msg)
+            self._log_error(error_msg)
             return None
     
     async def download_media(self, media_url, filepath):
@@ -199,36 +332,45 @@ class APIRequestHandler:
         Args:
             media_url (str): URL to download from
             filepath (str): Path to save the file
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(media_url) as response:
-                    if response.status == 200:
-                        media_bytes = await response.read()
-                        
-                        # Save the media file
-                        with open(filepath, 'wb') as f:
-                            f.write(media_bytes)
-                        
-                        if hasattr(self.logger, 'log'):
-                            self.logger.log(f"Media saved successfully to: {filepath}", level='INFO')
-                        return True
-                    else:
-                        error_msg = f"Error downloading media: HTTP {response.status}"
-                        if hasattr(self.logger, 'log'):
-                            self.logger.log(error_msg, level='ERROR')
+            session = await self._get_session()
+            async with session.get(media_url) as response:
+                if response.status == 200:
+                    # Stream to a .part file and move it into place atomically,
+                    # so an interrupted download never leaves a truncated file at filepath
+                    # (unique per download, so concurrent saves to the same filepath don't share it)
+                    part_path = f"{filepath}.{uuid.uuid4().hex}.part"
+                    try:
+                        if aiofiles is not None:
+                            async with aiofiles.open(part_path, 'wb') as f:
+                                async for chunk in response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE):
+                                    await f.write(chunk)
                         else:
-                            self.logger(error_msg)
-                        return False
+                            with open(part_path, 'wb') as f:
+                                async for chunk in response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE):
+                                    f.write(chunk)
+                        os.replace(part_path, filepath)
+                    except BaseException:
+                        # Also covers cancellation from Stopgeneration
+                        try:
+                            os.unlink(part_path)
+                        except OSError:
+                            pass
+                        raise
+                    
+                    self._log_info(f"Media saved successfully to: {filepath}")
+                    return True
+                else:
+                    error_msg = f"Error downloading media: HTTP {response.status}"
+                    self._log_error(error_msg)
+                    return False
         except Exception as e:
             error_msg = f"Unexpected error downloading media: {e}"
-            if hasattr(self.logger, 'log'):
-                self.logger.log(error_msg, level='ERROR')
-            else:
-                self.logger(error_msg)
+            self._log_error(error_msg)
             return False
     
     def extract_media_url(self, response_data, media_type='image'):
@@ -238,24 +380,24 @@ class APIRequestHandler:
         Args:
             response_data (dict): API response data
             media_type (str): 'image' or 'video'
-            
+        
         Returns:
             str: Media URL, or None if not found
         """
-        if media_type == 'image':
-            # Handle image response formats
-            if 'data' in response_data and len(response_data['data']) > 0:
+        # Index straight into the expected shape; a missing or malformed field means no URL
+        try:
+            if media_type == 'image':
+                # Handle image response formats
                 image_data = response_data['data'][0]
                 if 'url' in image_data:
                     return image_data['url']
-                elif 'b64_json' in image_data:
-                    # Return base64 data as-is (caller will handle)
-                    return image_data['b64_json']
-        elif media_type == 'video':
-            # Handle video response formats
-            video_data = response_data.get('video')
-            if video_data and 'url' in video_data:
-                return video_data['url']
+                # Return base64 data as-is (caller will handle)
+                return image_data.get('b64_json')
+            elif media_type == 'video':
+                # Handle video response formats
+                return response_data['video']['url']
+        except (KeyError, IndexError, TypeError, AttributeError):
+            pass
         
         return None
     
@@ -265,7 +407,7 @@ class APIRequestHandler:
         
         Args:
             response_data (dict): API response data
-            
+        
         Returns:
             str: Generation ID, or None if not found
         """
@@ -5,7 +5,38 @@ Detects appropriate models based on available inputs (reference images, media ty
 """
 
 import re
-from models_registry import get_registry, get_models_by_type, get_models_by_detection
+from functools import lru_cache
+from models_registry import get_registry, get_models_by_type, get_models_by_detection, get_models_by_type_and_reference
+
+# Version number in a model ID (e.g. v2.5 -> 2, 5), used by _score_model
+_VERSION_RE = re.compile(r'v?(\d+)\.?(\d*)')
+
+
+@lru_cache(maxsize=256)
+def _score_model(model_id):
+    """
+    Ranking score for a model ID (higher is preferred), see ModelDetector._rank_models.
+    Depends only on the ID, so results are memoized.
+    """
+    score = 0
+    model_lower = model_id.lower()
+    
+    # Pro models get highest priority
+    if 'pro' in model_lower:
+        score += 1000
+    
+    # Turbo models get high priority
+    if 'turbo' in model_lower:
+        score += 500
+    
+    # Extract version numbers (e.g., v2.5 -> 2.5)
+    version_match = _VERSION_RE.search(model_id)
+    if version_match:
+        major = int(version_match.group(1))
+        minor = int(version_match.group(2)) if version_match.group(2) else 0
+        score += major * 100 + minor
+    
+    return score
 
 
 class ModelDetector:
@@ -19,6 +50,8 @@ class ModelDetector:
         'editing': r'.*edit.*|.*-edit$',
         'generation': r'.*pro.*|.*standard.*'
     }
+    # PATTERNS compiled once at class load
+    _COMPILED_PATTERNS = {key: re.compile(pattern, re.IGNORECASE) for key, pattern in PATTERNS.items()}
     
     def __init__(self, registry=None):
         """
@@ -41,18 +74,8 @@ class ModelDetector:
         Returns:
             str: Model ID, or None if no match found
         """
-        # Filter by media type
-        candidates = get_models_by_type(media_type)
-        
-        # Filter by reference requirement
-        if has_reference_image:
-            # Filter for models that require reference
-            candidates = {k: v for k, v in candidates.items() 
-                         if v.get('detection', {}).get('requires_reference', False)}
-        else:
-            # Filter for models that don't require reference
-            candidates = {k: v for k, v in candidates.items() 
-                         if not v.get('detection', {}).get('requires_reference', False)}
+        # Filter by media type and reference requirement (precomputed index lookup)
+        candidates = get_models_by_type_and_reference(media_type, has_reference_image)
         
         if not candidates:
             return None
@@ -91,8 +114,9 @@ class ModelDetector:
         Returns:
             bool: True if matches pattern
         """
-        pattern = self.PATTERNS.get(pattern_key, '')
-        return bool(re.search(pattern, model_id, re.IGNORECASE))
+        pattern = self._COMPILED_PATTERNS.get(pattern_key)
+        # Unknown keys match everything (same as searching an empty pattern)
+        return pattern is None or bool(pattern.search(model_id))
     
     def _filter_by_type(self, media_type):
         """
@@ -124,30 +148,10 @@ class ModelDetector:
         # 2. Models with 'turbo' in name
         # 3. Models with version numbers (higher is better)
         # 4. Alphabetically first
-        
-        def score_model(model_id):
-            score = 0
-            model_lower = model_id.lower()
-            
-            # Pro models get highest priority
-            if 'pro' in model_lower:
-                score += 1000
-            
-            # Turbo models get high priority
-            if 'turbo' in model_lower:
-                score += 500
-            
-            # Extract version numbers (e.g., v2.5 -> 2.5)
-            version_match = re.search(r'v?(\d+)\.?(\d*)', model_id)
-            if version_match:
-                major = int(version_match.group(1))
-                minor = int(version_match.group(2)) if version_match.group(2) else 0
-                score += major * 100 + minor
-            
-            return score
+        # Scores come from the memoized module-level _score_model
         
         # Sort by score (descending), then alphabetically
-        sorted_models = sorted(candidates.keys(), key=lambda x: (-score_model(x), x))
+        sorted_models = sorted(candidates.keys(), key=lambda x: (-_score_model(x), x))
         
         return sorted_models[0] if sorted_models else None
     
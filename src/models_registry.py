@@ -9,12 +9,97 @@ and detection rules. Models can be added via Python dict or JSON file.
 from parameter_templates import (
     IMAGE_ASPECT_RATIO_GOOGLE,
     IMAGE_RESOLUTION_GOOGLE,
+    IMAGE_URL_OPTIONAL,
     VIDEO_DURATION_STANDARD,
     VIDEO_DURATION_MINIMAX,
     VIDEO_DURATION_LTXV,
     VIDEO_ASPECT_RATIO_STANDARD,
     CFG_SCALE_STANDARD
 )
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+# Prefer orjson for parsing the JSON registry; fall back to stdlib json
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Directory of this module; relative JSON registry paths are resolved against it
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Endpoint and polling settings shared by most video models (spread into each entry; entries can override keys)
+_VIDEO_POLLING_BASE = MappingProxyType({
+    'type': 'video',
+    'endpoint_type': 'standard',
+    'endpoint': '/v2/video/generations',
+    'method': 'POST',
+    'response_type': 'polling',
+    'poll_endpoint': '/v2/video/generations',
+    'poll_method': 'GET',
+    'poll_interval': 10,
+    'poll_timeout': 1000
+})
+
+# MiniMax uses its provider-specific endpoint for both creation and polling
+_MINIMAX_POLLING_BASE = MappingProxyType({
+    **_VIDEO_POLLING_BASE,
+    'endpoint_type': 'provider',
+    'endpoint': '/v2/generate/video/minimax/generation',
+    'poll_endpoint': '/v2/generate/video/minimax/generation'
+})
+
+# Detection rules shared by the registry entries (read-only: every entry holds the same object)
+_DETECTION_REFERENCE = MappingProxyType({
+    'requires_reference': True,
+    'reference_check': 'REF_IN1_'
+})
+_DETECTION_NO_REFERENCE = MappingProxyType({
+    'requires_reference': False,
+    'reference_check': 'REF_IN1_'
+})
+
+def _runway_video(model_id, *, image=False):
+    """
+    Build a Runway video registry entry.
+    
+    Args:
+        model_id (str): Model identifier (also the 'model' parameter default)
+        image (bool): Whether the model takes a required first frame (image_url) and optional last frame (tail_image_url)
+        
+    Returns:
+        dict: Model configuration
+    """
+    parameters = {
+        'model': {
+            'type': 'str',
+            'default': model_id,
+            'required': True
+        },
+        'prompt': {
+            'type': 'str',
+            'required': True
+        }
+    }
+    if image:
+        parameters['image_url'] = {
+            'type': 'str',
+            'required': True
+        }
+        parameters['tail_image_url'] = {
+            'type': 'str',
+            'required': False
+        }
+    parameters['duration'] = VIDEO_DURATION_STANDARD
+    parameters['aspect_ratio'] = VIDEO_ASPECT_RATIO_STANDARD
+    parameters['cfg_scale'] = CFG_SCALE_STANDARD
+    return {
+        **_VIDEO_POLLING_BASE,
+        'parameters': parameters,
+        'detection': _DETECTION_REFERENCE if image else _DETECTION_NO_REFERENCE
+    }
 
 # Base model registry (Python dict)
 MODELS_REGISTRY = {
@@ -38,10 +123,7 @@ MODELS_REGISTRY = {
                 'max': 4
             }
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'google/nano-banana-pro-edit': {
@@ -69,22 +151,11 @@ MODELS_REGISTRY = {
                 'max': 4
             }
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     'klingai/v2.5-turbo/pro/text-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -99,22 +170,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'klingai/v2.5-turbo/pro/image-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -133,10 +193,7 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     # Kling Image Model
@@ -165,23 +222,12 @@ MODELS_REGISTRY = {
                 'max': 4
             }
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     # Kling 1.6 Models
     'kling-video/v1.6/standard/text-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -196,22 +242,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'kling-video/v1.6/standard/image-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -230,22 +265,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     'kling-video/v1.6/standard/multi-image-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -264,22 +288,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     'kling-video/v1.6/pro/text-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -294,22 +307,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'kling-video/v1.6/pro/image-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -328,23 +330,12 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     # Kling 2.1 Master Models
     'klingai/v2.1-master-text-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -359,22 +350,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'klingai/v2.1-master-image-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -393,23 +373,12 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     # Kling 2.6 Pro Models
     'klingai/video-v2-6-pro-text-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -424,22 +393,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'klingai/video-v2-6-pro-image-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -458,23 +416,12 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     # Kling O1 Models
     'klingai/video-o1-image-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -497,22 +444,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     'klingai/video-o1-reference-to-video': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -527,50 +463,17 @@ MODELS_REGISTRY = {
                 'type': 'str',
                 'required': True
             },
-            'image_url_2': {
-                'type': 'str',
-                'required': False
-            },
-            'image_url_3': {
-                'type': 'str',
-                'required': False
-            },
-            'image_url_4': {
-                'type': 'str',
-                'required': False
-            },
-            'image_url_5': {
-                'type': 'str',
-                'required': False
-            },
-            'image_url_6': {
-                'type': 'str',
-                'required': False
-            },
-            'image_url_7': {
-                'type': 'str',
-                'required': False
-            },
+            # Optional extra references, sent as image_url_2 ... image_url_7
+            **{f'image_url_{i}': IMAGE_URL_OPTIONAL for i in range(2, 8)},
             'duration': VIDEO_DURATION_STANDARD,
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     'klingai/video-o1-video-to-video-edit': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -589,22 +492,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     'klingai/video-o1-video-to-video-reference': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -627,24 +519,14 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     # Ltxv Models
     # Based on https://docs.aimlapi.com/api-references/video-models/ltxv/ltxv-2
     'ltxv/ltxv-2': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
+        **_VIDEO_POLLING_BASE,
         'poll_interval': 15,  # Docs recommend 15 seconds
-        'poll_timeout': 1000,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -678,22 +560,12 @@ MODELS_REGISTRY = {
             # Note: cfg_scale not supported by this model
             # Note: fps and generate_audio are not supported by the API (removed due to "Unrecognized keys" error)
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'ltxv/ltxv-2-fast': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
+        **_VIDEO_POLLING_BASE,
         'poll_interval': 15,  # Docs recommend 15 seconds
-        'poll_timeout': 1000,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -727,23 +599,12 @@ MODELS_REGISTRY = {
             # Note: cfg_scale not supported by this model
             # Note: fps and generate_audio are not supported by the API (removed due to "Unrecognized keys" error)
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     # MiniMax Models
     'minimax/hailuo-02': {
-        'type': 'video',
-        'endpoint_type': 'provider',
-        'endpoint': '/v2/generate/video/minimax/generation',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/generate/video/minimax/generation',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_MINIMAX_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -763,22 +624,11 @@ MODELS_REGISTRY = {
             # Note: cfg_scale not supported by this model
             # Note: image_url is optional - only include for image-to-video
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'minimax/hailuo-2.3': {
-        'type': 'video',
-        'endpoint_type': 'provider',
-        'endpoint': '/v2/generate/video/minimax/generation',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/generate/video/minimax/generation',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_MINIMAX_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -798,22 +648,11 @@ MODELS_REGISTRY = {
             # Note: cfg_scale not supported by this model
             # Note: image_url is optional - only include for image-to-video
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'minimax/hailuo-2.3-fast': {
-        'type': 'video',
-        'endpoint_type': 'provider',
-        'endpoint': '/v2/generate/video/minimax/generation',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/generate/video/minimax/generation',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_MINIMAX_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -833,23 +672,12 @@ MODELS_REGISTRY = {
             # Note: cfg_scale not supported by this model
             # Note: image_url is optional - only include for image-to-video
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     # Alibaba Cloud Models
     'alibaba/wan2.5-t2v-preview': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -864,22 +692,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'alibaba/wan2.5-i2v-preview': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -898,23 +715,12 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
             'cfg_scale': CFG_SCALE_STANDARD
         },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_REFERENCE
     },
     
     # LumaAI Models
     'luma/ray-2': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -929,22 +735,11 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD
             # Note: cfg_scale not supported by this model
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     'luma/ray-flash-2': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
+        **_VIDEO_POLLING_BASE,
         'parameters': {
             'model': {
                 'type': 'str',
@@ -959,149 +754,45 @@ MODELS_REGISTRY = {
             'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD
             # Note: cfg_scale not supported by this model
         },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
+        'detection': _DETECTION_NO_REFERENCE
     },
     
     # Runway Models
-    'gen3a_turbo': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
-        'parameters': {
-            'model': {
-                'type': 'str',
-                'default': 'gen3a_turbo',
-                'required': True
-            },
-            'prompt': {
-                'type': 'str',
-                'required': True
-            },
-            'image_url': {
-                'type': 'str',
-                'required': True
-            },
-            'tail_image_url': {
-                'type': 'str',
-                'required': False
-            },
-            'duration': VIDEO_DURATION_STANDARD,
-            'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
-            'cfg_scale': CFG_SCALE_STANDARD
-        },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
-    },
+    'gen3a_turbo': _runway_video('gen3a_turbo', image=True),
+    'runway/gen4_turbo': _runway_video('runway/gen4_turbo', image=True),
+    'runway/gen4_aleph': _runway_video('runway/gen4_aleph'),
+    'runway/act_two': _runway_video('runway/act_two')
+}
+
+def _build_registry_indexes(registry):
+    """
+    Bucket a registry by media type, by requires_reference, by both, and by endpoint, in one pass.
     
-    'runway/gen4_turbo': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
-        'parameters': {
-            'model': {
-                'type': 'str',
-                'default': 'runway/gen4_turbo',
-                'required': True
-            },
-            'prompt': {
-                'type': 'str',
-                'required': True
-            },
-            'image_url': {
-                'type': 'str',
-                'required': True
-            },
-            'tail_image_url': {
-                'type': 'str',
-                'required': False
-            },
-            'duration': VIDEO_DURATION_STANDARD,
-            'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
-            'cfg_scale': CFG_SCALE_STANDARD
-        },
-        'detection': {
-            'requires_reference': True,
-            'reference_check': 'REF_IN1_'
-        }
-    },
+    Returns:
+        tuple: (by_type, by_detection, by_type_and_reference, by_endpoint) read-only mappings;
+            the first three map to model_id -> config, by_endpoint to a tuple of model IDs
+    """
+    by_type = {}
+    by_detection = {}
+    by_type_and_reference = {}
+    by_endpoint = {}
+    for model_id, config in registry.items():
+        media_type = config.get('type')
+        requires_reference = config.get('detection', {}).get('requires_reference')
+        by_type.setdefault(media_type, {})[model_id] = config
+        by_detection.setdefault(requires_reference, {})[model_id] = config
+        by_type_and_reference.setdefault((media_type, bool(requires_reference)), {})[model_id] = config
+        by_endpoint.setdefault(config.get('endpoint'), []).append(model_id)
     
-    'runway/gen4_aleph': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
-        'parameters': {
-            'model': {
-                'type': 'str',
-                'default': 'runway/gen4_aleph',
-                'required': True
-            },
-            'prompt': {
-                'type': 'str',
-                'required': True
-            },
-            'duration': VIDEO_DURATION_STANDARD,
-            'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
-            'cfg_scale': CFG_SCALE_STANDARD
-        },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
-    },
+    def freeze(index):
+        return MappingProxyType({key: MappingProxyType(bucket) for key, bucket in index.items()})
     
-    'runway/act_two': {
-        'type': 'video',
-        'endpoint_type': 'standard',
-        'endpoint': '/v2/video/generations',
-        'method': 'POST',
-        'response_type': 'polling',
-        'poll_endpoint': '/v2/video/generations',
-        'poll_method': 'GET',
-        'poll_interval': 10,
-        'poll_timeout': 1000,
-        'parameters': {
-            'model': {
-                'type': 'str',
-                'default': 'runway/act_two',
-                'required': True
-            },
-            'prompt': {
-                'type': 'str',
-                'required': True
-            },
-            'duration': VIDEO_DURATION_STANDARD,
-            'aspect_ratio': VIDEO_ASPECT_RATIO_STANDARD,
-            'cfg_scale': CFG_SCALE_STANDARD
-        },
-        'detection': {
-            'requires_reference': False,
-            'reference_check': 'REF_IN1_'
-        }
-    }
-}
+    return (freeze(by_type), freeze(by_detection), freeze(by_type_and_reference),
+            MappingProxyType({endpoint: tuple(model_ids) for endpoint, model_ids in by_endpoint.items()}))
+
+# Read-only indexes over the built-in MODELS_REGISTRY (see get_models_by_type, get_models_by_detection,
+# get_models_by_endpoint)
+_BY_TYPE, _BY_DETECTION, _BY_TYPE_AND_REFERENCE, _BY_ENDPOINT = _build_registry_indexes(MODELS_REGISTRY)
 
 def get_model_config(model_id):
     """
@@ -1125,7 +816,7 @@ def get_models_by_type(media_type):
     Returns:
         dict: Dictionary of model_id -> config for matching models
     """
-    return {k: v for k, v in MODELS_REGISTRY.items() if v.get('type') == media_type}
+    return dict(_BY_TYPE.get(media_type, {}))
 
 def get_models_by_detection(requires_reference):
     """
@@ -1137,55 +828,105 @@ def get_models_by_detection(requires_reference):
     Returns:
         dict: Dictionary of model_id -> config for matching models
     """
-    result = {}
-    for model_id, config in MODELS_REGISTRY.items():
-        detection = config.get('detection', {})
-        if detection.get('requires_reference') == requires_reference:
-            result[model_id] = config
-    return result
+    return dict(_BY_DETECTION.get(requires_reference, {}))
+
+def get_models_by_endpoint(endpoint):
+    """
+    Get the IDs of all models served by an endpoint.
+    
+    Args:
+        endpoint (str): Endpoint path (e.g., '/v2/video/generations')
+        
+    Returns:
+        tuple: Model IDs using the endpoint (empty if none)
+    """
+    return _BY_ENDPOINT.get(endpoint, ())
+
+def get_models_by_type_and_reference(media_type, requires_reference):
+    """
+    Get all models of a media type that require (or don't require) reference images.
+    Models without a requires_reference flag count as not requiring one.
+    
+    Args:
+        media_type (str): 'image' or 'video'
+        requires_reference (bool): True for models requiring reference, False otherwise
+        
+    Returns:
+        dict: Dictionary of model_id -> config for matching models
+    """
+    return dict(_BY_TYPE_AND_REFERENCE.get((media_type, bool(requires_reference)), {}))
 
 def load_registry_from_json(json_path='models_registry.json'):
     """
     Load model configurations from JSON file and merge with existing registry.
     
     Args:
-        json_path (str): Path to JSON file (relative to src/ directory)
+        json_path (str): Path to JSON file (absolute, or relative to src/ directory)
         
     Returns:
         dict: Merged registry
     """
-    import json
-    import os
-    
-    # Try to find the JSON file
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    full_path = os.path.join(script_dir, json_path)
+    full_path = json_path if os.path.isabs(json_path) else os.path.join(_SCRIPT_DIR, json_path)
     
-    if os.path.exists(full_path):
-        try:
-            with open(full_path, 'r') as f:
-                json_registry = json.load(f)
-            
-            # Merge with existing registry (JSON takes precedence)
-            merged = MODELS_REGISTRY.copy()
-            merged.update(json_registry)
-            return merged
-        except Exception as e:
-            print(f"Error loading JSON registry: {e}")
-            return MODELS_REGISTRY
-    else:
+    try:
+        with open(full_path, 'rb') as f:
+            json_registry = _json_loads(f.read())
+    except FileNotFoundError:
         # Return existing registry if JSON doesn't exist
         return MODELS_REGISTRY
+    except (OSError, ValueError) as e:
+        print(f"Error loading JSON registry: {e}")
+        return MODELS_REGISTRY
+    if not isinstance(json_registry, dict):
+        print(f"Error loading JSON registry: expected an object of model configs, got {type(json_registry).__name__}")
+        return MODELS_REGISTRY
+    if not json_registry:
+        # Nothing to overlay; no need to copy the built-in registry
+        return MODELS_REGISTRY
+    
+    # Merge with existing registry (JSON takes precedence)
+    return MODELS_REGISTRY | json_registry
+
+# Merged registry, loaded on first get_registry() call (cleared by reload_registry)
+_REGISTRY_CACHE = None
 
 def get_registry():
     """
     Get the complete model registry, loading from JSON if available.
+    The merged registry is cached; call reload_registry() to pick up JSON changes.
+    
+    Returns:
+        dict: Complete model registry
+    """
+    global _REGISTRY_CACHE
+    if _REGISTRY_CACHE is None:
+        _REGISTRY_CACHE = load_registry_from_json()
+    return _REGISTRY_CACHE
+
+def reload_registry():
+    """
+    Discard the cached registry and load it again (e.g. after editing models_registry.json).
     
     Returns:
         dict: Complete model registry
     """
-    return load_registry_from_json()
+    global _REGISTRY_CACHE
+    _REGISTRY_CACHE = None
+    return get_registry()
 
+# Provider name by model ID prefix (the segment before the first '/', lowercased)
+_PROVIDER_BY_PREFIX = {
+    'google': 'Google',
+    'klingai': 'Kling',
+    'kling-video': 'Kling',
+    'minimax': 'MiniMax',
+    'alibaba': 'Alibaba Cloud',
+    'luma': 'LumaAI',
+    'runway': 'Runway',
+    'ltxv': 'Ltxv',
+}
+
+@lru_cache(maxsize=256)
 def extract_provider_from_model_id(model_id):
     """
     Extract provider name from model ID based on prefix patterns.
@@ -1199,26 +940,35 @@ def extract_provider_from_model_id(model_id):
     if not model_id:
         return None
     
-    model_id_lower = model_id.lower()
-    
-    # Check prefixes in order of specificity
-    if model_id_lower.startswith('google/'):
-        return 'Google'
-    elif model_id_lower.startswith('klingai/') or model_id_lower.startswith('kling-video/'):
-        return 'Kling'
-    elif model_id_lower.startswith('minimax/'):
-        return 'MiniMax'
-    elif model_id_lower.startswith('alibaba/'):
-        return 'Alibaba Cloud'
-    elif model_id_lower.startswith('luma/'):
-        return 'LumaAI'
-    elif model_id_lower.startswith('runway/') or model_id_lower.startswith('gen'):
+    slash = model_id.find('/')
+    head = model_id[:slash] if slash >= 0 else model_id
+    if not head.islower():
+        # Registry IDs are already lowercase; only fold mixed-case input
+        head = head.lower()
+    if slash >= 0:
+        provider = _PROVIDER_BY_PREFIX.get(head)
+        if provider is not None:
+            return provider
+    # Runway's legacy IDs (e.g. 'gen3a_turbo') have no provider prefix
+    if head.startswith('gen'):
         return 'Runway'
-    elif model_id_lower.startswith('ltxv/'):
-        return 'Ltxv'
-    else:
-        # Default or unknown provider
-        return None
+    # Default or unknown provider
+    return None
+
+def iter_models_by_provider(provider, media_type=None):
+    """
+    Iterate over the models of a specific provider, optionally filtered by media type.
+    
+    Args:
+        provider (str): Provider name (e.g., 'Kling', 'Google')
+        media_type (str, optional): 'image' or 'video' to filter by type
+        
+    Yields:
+        tuple: (model_id, config) for each matching model, sorted by model ID
+    """
+    registry = get_registry()
+    for model_id in get_provider_index(registry).get((provider, media_type or None), ()):
+        yield model_id, registry[model_id]
 
 def get_models_by_provider(provider, media_type=None):
     """
@@ -1231,21 +981,175 @@ def get_models_by_provider(provider, media_type=None):
     Returns:
         dict: Dictionary of model_id -> config for matching models
     """
-    registry = get_registry()
-    result = {}
+    return dict(iter_models_by_provider(provider, media_type))
+
+def build_provider_index(registry):
+    """
+    Bucket a registry's model IDs by provider and media type in one pass.
     
-    for model_id, config in registry.items():
-        model_provider = extract_provider_from_model_id(model_id)
-        
-        # Check provider match
-        if model_provider != provider:
-            continue
+    Args:
+        registry (dict): Model registry (e.g. from get_registry())
         
-        # Check media type if specified
-        if media_type and config.get('type') != media_type:
+    Returns:
+        dict: (provider, media_type) -> sorted tuple of model IDs; media_type None lists all of the provider's models
+    """
+    index = {}
+    for model_id, config in registry.items():
+        provider = extract_provider_from_model_id(model_id)
+        if provider is None:
             continue
+        index.setdefault((provider, None), []).append(model_id)
+        media_type = config.get('type')
+        if media_type:
+            index.setdefault((provider, media_type), []).append(model_id)
+    return {key: tuple(sorted(model_ids)) for key, model_ids in index.items()}
+
+# (registry, provider index) for the registry the index was last built from (see get_provider_index)
+_PROVIDER_INDEX_CACHE = None
+
+def get_provider_index(registry=None):
+    """
+    Get the provider index of a registry, reusing it while the same registry object is passed.
+    A reloaded registry is a new object, so the index is rebuilt for it automatically.
+    
+    Args:
+        registry (dict, optional): Model registry. If None, uses get_registry()
         
-        result[model_id] = config
+    Returns:
+        dict: (provider, media_type) -> sorted tuple of model IDs (see build_provider_index)
+    """
+    global _PROVIDER_INDEX_CACHE
+    if registry is None:
+        registry = get_registry()
+    cached = _PROVIDER_INDEX_CACHE
+    if cached is None or cached[0] is not registry:
+        cached = _PROVIDER_INDEX_CACHE = (registry, build_provider_index(registry))
+    return cached[1]
+
+
+@dataclass(frozen=True, slots=True)
+class ParamCaps:
+    """Menu options and default of an optional model parameter."""
+    options: tuple = None  # Menu options, or None if the parameter is not a menu
+    default: object = None  # Registry default, or None if unspecified
+    option_set: frozenset = frozenset()  # options as a set, for constant-time membership tests
+
+
+@dataclass(frozen=True, slots=True)
+class ModelCaps:
+    """Parameter capabilities of a model, precomputed from its registry parameters."""
+    resolution: ParamCaps = None  # None if the model doesn't support the parameter
+    fps: ParamCaps = None
+    generate_audio: ParamCaps = None
+    duration_options: tuple = None  # Duration menu options, or None to keep the current menu
+    duration_option_set: frozenset = frozenset()
+    payload_fields: tuple = ()  # (payload_key, par_name, param_def, cast) for each supported request field
+    first_frame_slot: str = None  # Payload key for the first frame image, or None if unsupported
+    first_frame_as_list: bool = False  # Whether the first frame is sent as a one-item list (image_urls)
+    last_frame_slots: tuple = ()  # Payload keys that take the last frame image
+    reference_slots: tuple = ()  # Payload key for each multi-reference image position (None if unsupported)
+    first_frame_required: bool = False  # Whether the first frame image parameter is marked required
+    multi_reference: bool = False  # Takes REF_IN1-REF_IN7 as reference images instead of a first frame
+
+
+# Optional request fields in payload order: (payload_key, par_name)
+# par_name None means the value is passed to the generation; otherwise it's read from that
+# component parameter when enabled
+PAYLOAD_FIELD_SOURCES = (
+    ('duration', None),
+    ('aspect_ratio', None),
+    ('cfg_scale', None),
+    ('resolution', 'Resolution'),
+    ('fps', 'Fps'),
+    ('generate_audio', 'Generateaudio'),
+)
+
+# Image payload keys, checked against a model's parameters when building its ModelCaps
+FIRST_FRAME_IMAGE_SLOTS = ('first_frame_image', 'image_url', 'image_urls')  # First supported one is used
+LAST_FRAME_IMAGE_SLOTS = ('last_image_url', 'tail_image_url')  # Every supported one is sent
+REFERENCE_IMAGE_SLOTS = ('image_url',) + tuple(f'image_url_{i}' for i in range(2, 8))  # REF_IN1-REF_IN7
+
+# Conversion for each parameter 'api_type' (unknown types have no cast and take the logged slow path)
+API_TYPE_CASTS = {
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'str': str,
+}
+
+# Fields the API rejects for some model families even though the registry lists them
+PAYLOAD_FIELD_EXCLUSIONS = {
+    'ltxv/': ('fps', 'generate_audio'),
+}
+
+
+def _build_param_caps(param_def):
+    """
+    Build the ParamCaps for a single parameter definition.
     
-    return result
+    Args:
+        param_def: Parameter definition from model config (dict, or a plain value)
+        
+    Returns:
+        ParamCaps: Menu options (if a menu with options) and default
+    """
+    if not isinstance(param_def, dict):
+        return ParamCaps()
+    options = param_def.get('options') if param_def.get('type') == 'menu' else None
+    if not options:
+        return ParamCaps(None, param_def.get('default'))
+    options = tuple(options)
+    return ParamCaps(options, param_def.get('default'), frozenset(options))
+
 
+def build_model_caps(model_config, model_id=''):
+    """
+    Walk a model's parameters once and collect the capabilities the UI callbacks
+    and request payload need.
+    
+    Args:
+        model_config (dict): Model configuration from registry
+        model_id (str, optional): Model identifier (for PAYLOAD_FIELD_EXCLUSIONS)
+        
+    Returns:
+        ModelCaps: Precomputed capabilities
+    """
+    model_params = model_config.get('parameters', {})
+    
+    excluded = ()
+    for prefix, fields in PAYLOAD_FIELD_EXCLUSIONS.items():
+        if model_id.startswith(prefix):
+            excluded = fields
+            break
+    payload_fields = []
+    for payload_key, par_name in PAYLOAD_FIELD_SOURCES:
+        if payload_key not in model_params or payload_key in excluded:
+            continue
+        param_def = model_params[payload_key]
+        # Resolve the api_type conversion once (defaults to 'str' for backward compatibility)
+        api_type = param_def.get('api_type', 'str') if isinstance(param_def, dict) else 'str'
+        payload_fields.append((payload_key, par_name, param_def, API_TYPE_CASTS.get(api_type)))
+    
+    def caps_for(name):
+        return _build_param_caps(model_params[name]) if name in model_params else None
+    
+    first_frame_slot = next((slot for slot in FIRST_FRAME_IMAGE_SLOTS if slot in model_params), None)
+    first_frame_def = model_params.get(first_frame_slot)
+    reference_slots = tuple(slot if slot in model_params else None for slot in REFERENCE_IMAGE_SLOTS)
+    
+    duration_caps = caps_for('duration')
+    return ModelCaps(
+        resolution=caps_for('resolution'),
+        fps=caps_for('fps'),
+        generate_audio=caps_for('generate_audio'),
+        duration_options=duration_caps.options if duration_caps else None,
+        duration_option_set=duration_caps.option_set if duration_caps else frozenset(),
+        payload_fields=tuple(payload_fields),
+        first_frame_slot=first_frame_slot,
+        first_frame_as_list=first_frame_slot == 'image_urls',
+        last_frame_slots=tuple(slot for slot in LAST_FRAME_IMAGE_SLOTS if slot in model_params),
+        reference_slots=reference_slots,
+        first_frame_required=isinstance(first_frame_def, dict) and bool(first_frame_def.get('required', False)),
+        # Models with more than one reference slot (image_url_2...) collect every REF_IN
+        multi_reference=any(reference_slots[1:])
+    )
@@ -2,6 +2,7 @@
 Parameter Templates - Reusable parameter schema definitions for media generation models.
 
 These templates can be referenced in model configurations to avoid duplication.
+Templates are shared by every model that uses them; don't mutate them in place.
 """
 
 # Video parameter templates
@@ -52,6 +53,12 @@ IMAGE_RESOLUTION_GOOGLE = {
     'help_text': 'Image resolution (default: 1K)'
 }
 
+# Optional extra reference image (e.g. image_url_2 ... image_url_7 of multi-reference models)
+IMAGE_URL_OPTIONAL = {
+    'type': 'str',
+    'required': False
+}
+
 # Common parameter templates
 CFG_SCALE_STANDARD = {
     'type': 'float',
@@ -70,6 +77,7 @@ PARAMETER_TEMPLATES = {
     'video_aspect_ratio_standard': VIDEO_ASPECT_RATIO_STANDARD,
     'image_aspect_ratio_google': IMAGE_ASPECT_RATIO_GOOGLE,
     'image_resolution_google': IMAGE_RESOLUTION_GOOGLE,
+    'image_url_optional': IMAGE_URL_OPTIONAL,
     'cfg_scale_standard': CFG_SCALE_STANDARD
 }
 
@@ -89,6 +97,7 @@ def resolve_template_reference(param_config):
     """
     Resolve a template reference in a parameter configuration.
     If the config contains 'template' key, replace it with the actual template.
+    Always returns a new dict, so callers may modify the result without affecting the shared template.
     
     Args:
         param_config (dict): Parameter configuration that may contain 'template' key
@@ -96,13 +105,15 @@ def resolve_template_reference(param_config):
     Returns:
         dict: Resolved parameter configuration
     """
-    if isinstance(param_config, dict) and 'template' in param_config:
-        template_name = param_config['template']
-        template = get_template(template_name)
-        if template:
-            # Merge template with any overrides in param_config
-            resolved = template.copy()
-            resolved.update({k: v for k, v in param_config.items() if k != 'template'})
-            return resolved
+    if not isinstance(param_config, dict):
+        return param_config
+    template_name = param_config.get('template')
+    if template_name is None:
+        return param_config
+    template = get_template(template_name)
+    if template:
+        # Merge template with any overrides in param_config
+        overrides = {k: v for k, v in param_config.items() if k != 'template'}
+        return {**template, **overrides}
     return param_config
 
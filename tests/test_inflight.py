@@ -0,0 +1,191 @@
+"""
+Tests for in-flight generation tracking (duplicate request suppression) through ImageGen.Generate.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+_IMPORT_ERROR = None
+try:
+    from ImageGen import ImageGen
+except ImportError as e:  # aiohttp and friends are only guaranteed inside TouchDesigner
+    ImageGen = None
+    _IMPORT_ERROR = e
+
+
+class FakeAsyncIOManager:
+    """
+    Mirrors AsyncIOManager's task bookkeeping: completion callbacks only run for tasks that finish
+    while pending or running, so cancelled tasks never reach them.
+    """
+
+    def __init__(self):
+        self.statuses = {}
+        self.callbacks = {}
+        self.task_counter = 0
+
+    def Run(self, coroutine, description=None, info=None, timeout=None, completion_callback=None):
+        # The generation itself is not run; only the submission bookkeeping is under test.
+        # Close the generation wrapped by _run_limited too (its finally never runs unstarted)
+        coroutine.cr_frame.f_locals['coro'].close()
+        coroutine.close()
+        task_id = self.task_counter
+        self.task_counter += 1
+        self.statuses[task_id] = 'pending'
+        self.callbacks[task_id] = completion_callback
+        return task_id
+
+    def Complete(self, task_id):
+        self.statuses[task_id] = 'completed'
+        self.callbacks[task_id](task_id)
+
+    def CancelTask(self, task_id):
+        if self.statuses.get(task_id) in ('pending', 'running'):
+            self.statuses[task_id] = 'cancelled'
+            return True
+        return False
+
+    def Cancelactive(self):
+        for task_id in list(self.statuses):
+            self.CancelTask(task_id)
+
+    def GetTaskInfo(self, task_id):
+        if task_id not in self.statuses:
+            return None
+        return {'task_id': task_id, 'status': self.statuses[task_id]}
+
+    def GetActiveTasksCount(self):
+        return sum(1 for status in self.statuses.values() if status in ('pending', 'running'))
+
+
+class FakeLogger:
+    def log(self, *args, **kwargs):
+        pass
+
+
+class FakePar:
+    """Custom parameter stand-in (value is returned by eval())."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self):
+        return self.value
+
+
+class FakePars:
+    def __init__(self, model):
+        self.Model = FakePar(model)
+        self.Aspectratio = FakePar('1:1')
+        self.Resolution = FakePar('1K')
+        self.Active = FakePar(False)
+
+    def __setattr__(self, name, value):
+        # TouchDesigner assigns parameter values with par.Name = value
+        if name in self.__dict__ and not isinstance(value, FakePar):
+            self.__dict__[name].value = value
+        else:
+            super().__setattr__(name, value)
+
+
+class FakeTOP:
+    def __init__(self, name, width=512, height=512):
+        self.name = name
+        self.path = f'/project1/imagegen/{name}'
+        self.width = width
+        self.height = height
+        self.totalCooks = 1
+        self.valid = True
+
+
+class FakeComp:
+    name = 'imagegen'
+
+    def __init__(self, model):
+        self.par = FakePars(model)
+        self.children = {}
+
+    def op(self, name):
+        return self.children.get(name)
+
+
+@unittest.skipIf(ImageGen is None, f"ImageGen dependencies unavailable: {_IMPORT_ERROR}")
+class InflightGenerateTests(unittest.TestCase):
+
+    def _make_gen(self, model):
+        self.mgr = FakeAsyncIOManager()
+        # Skip __init__, which builds TouchDesigner parameters; set the state Generate uses
+        gen = ImageGen.__new__(ImageGen)
+        gen.ownerComp = FakeComp(model)
+        gen.media_type = 'image'
+        gen.logger = FakeLogger()
+        gen._async_mgr = self.mgr
+        gen._inflight = {}
+        gen._op_cache = {}
+        gen._prompt_cache = None
+        gen._model_caps = {}
+        self.gen = gen
+        return gen
+
+    def _generate(self, prompt='a red fox'):
+        return self.gen.Generate(prompt=prompt, output_dir='/tmp/out')
+
+    def test_duplicate_request_reuses_running_task(self):
+        self._make_gen('google/nano-banana-pro')
+        first = self._generate()
+        self.assertIsNotNone(first)
+        self.assertEqual(self._generate(), first)
+        self.assertEqual(self.mgr.task_counter, 1)
+
+    def test_different_prompt_starts_new_task(self):
+        self._make_gen('google/nano-banana-pro')
+        first = self._generate()
+        self.assertNotEqual(self._generate('a blue fox'), first)
+
+    def test_resubmit_after_completion_starts_new_task(self):
+        self._make_gen('google/nano-banana-pro')
+        first = self._generate()
+        self.mgr.Complete(first)
+        self.assertNotEqual(self._generate(), first)
+
+    def test_resubmit_after_stopgeneration_starts_new_task(self):
+        self._make_gen('google/nano-banana-pro')
+        first = self._generate()
+        self.gen.Stopgeneration()
+        self.assertEqual(self.mgr.statuses[first], 'cancelled')
+        second = self._generate()
+        self.assertNotEqual(second, first)
+        self.assertEqual(self.mgr.statuses[second], 'pending')
+
+    def test_resubmit_after_task_cancelled_elsewhere_starts_new_task(self):
+        self._make_gen('google/nano-banana-pro')
+        first = self._generate()
+        # e.g. cancelled from the TDAsyncIO component or timed out; Generate's callback never runs
+        self.mgr.CancelTask(first)
+        second = self._generate()
+        self.assertNotEqual(second, first)
+        self.assertEqual(self._generate(), second)
+
+    def test_resubmit_after_task_removed_starts_new_task(self):
+        self._make_gen('google/nano-banana-pro')
+        first = self._generate()
+        del self.mgr.statuses[first]  # Cleared from the manager's table
+        self.assertNotEqual(self._generate(), first)
+
+    def test_recooked_reference_image_starts_new_task(self):
+        gen = self._make_gen('google/nano-banana-pro-edit')
+        ref = FakeTOP('REF_IN1')
+        gen.ownerComp.children = {'REF_IN1_': FakeTOP('REF_IN1_'), 'REF_IN1': ref}
+        first = self._generate()
+        self.assertIsNotNone(first)
+        self.assertEqual(self._generate(), first)
+        # New pixels on a paused timeline: cookFrame would not change, the cook count does
+        ref.totalCooks += 1
+        self.assertNotEqual(self._generate(), first)
+
+
+if __name__ == '__main__':
+    unittest.main()